@@ -1,37 +1,48 @@
-import os
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from agents.llm_factory import get_agent_llm
 
 load_dotenv()
 
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo", # Use a capable model if LLM validation is needed
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.3, # Low temperature for analytical tasks
-    model_kwargs={"max_concurrency":3} # Lower concurrency might be fine
-)
+# Agent and LLM are built on first use (then memoized); validate_outputs() needs neither.
 
-boss_agent = Agent(
-    role='Chief Validation Officer',
-    goal=(
-        "Oversee the outputs of other AI agents in the career advisor system. "
-        "Validate outputs for completeness (no empty fields), basic consistency "
-        "(e.g., skills match the role domain), and detect potential issues like "
-        "hallucinated or nonsensical content. Provide a final confidence score or flag errors."
-    ),
-    backstory=(
-        "You are the final checkpoint in the AI-powered Tech Career Advisor. "
-        "With meticulous attention to detail, you review the work of other agents "
-        "(like skill definitions, learning resources, job postings) before presenting "
-        "it to the user. Your primary function is quality control, ensuring accuracy, "
-        "relevance, and preventing errors or nonsensical outputs. You don't generate "
-        "content yourself, but you critically evaluate it."
-    ),
-    verbose=True,
-    allow_delegation=False, # Does not delegate, only reviews
-    # llm=llm # Assign LLM if needed for advanced validation tasks later
-)
+# --- LLM (shared HTTP pool, per-agent sampling settings; see agents/llm_factory.py) ---
+def get_llm():
+    return get_agent_llm('boss')
+
+@lru_cache(maxsize=None)
+def get_boss_agent():
+    Agent = timed_import("crewai").Agent
+    with timed("build boss_agent"):
+        return Agent(
+            role='Chief Validation Officer',
+            goal=(
+                "Oversee the outputs of other AI agents in the career advisor system. "
+                "Validate outputs for completeness (no empty fields), basic consistency "
+                "(e.g., skills match the role domain), and detect potential issues like "
+                "hallucinated or nonsensical content. Provide a final confidence score or flag errors."
+            ),
+            backstory=(
+                "You are the final checkpoint in the AI-powered Tech Career Advisor. "
+                "With meticulous attention to detail, you review the work of other agents "
+                "(like skill definitions, learning resources, job postings) before presenting "
+                "it to the user. Your primary function is quality control, ensuring accuracy, "
+                "relevance, and preventing errors or nonsensical outputs. You don't generate "
+                "content yourself, but you critically evaluate it."
+            ),
+            verbose=True,
+            allow_delegation=False, # Does not delegate, only reviews
+            # llm=get_llm() # Assign LLM if needed for advanced validation tasks later
+        )
+
+# Backwards-compatible lazy module attributes
+def __getattr__(name):
+    if name == 'boss_agent':
+        return get_boss_agent()
+    if name == 'llm':
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Placeholder for validation logic (to be implemented in Phase 2/3)
 def validate_outputs(agent_outputs):
@@ -1,45 +1,61 @@
-import os
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from agents.llm_factory import get_agent_llm
 
 load_dotenv()
 
-# --- Instantiate ChatOpenAI ---
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo", # Good balance for creative generation
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.8, # Higher temperature for more varied job descriptions
-    model_kwargs={"max_concurrency":5}
-)
+# Agent and prompt are built on first use (then memoized) so importing this module stays cheap.
+
+# --- LLM (shared HTTP pool, per-agent sampling settings; see agents/llm_factory.py) ---
+def get_llm():
+    return get_agent_llm('job_match_generator')
 
 # --- Load Prompt ---
-try:
-    with open('./prompts/job_match_prompt.txt', 'r') as f:
-        job_match_prompt = f.read()
-except FileNotFoundError:
-    print("ERROR: Job match prompt file not found.")
-    job_match_prompt = "Generate a realistic mock job posting for role: {role}." # Fallback
+@lru_cache(maxsize=None)
+def get_job_match_prompt():
+    try:
+        with open('./prompts/job_match_prompt.txt', 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print("ERROR: Job match prompt file not found.")
+        return "Generate a realistic mock job posting for role: {role}." # Fallback
 
 # --- Create Agent ---
-job_match_generator_agent = Agent(
-    role='Mock Job Posting Creator',
-    goal=job_match_prompt,
-    backstory=(
-        "You are a creative AI assistant skilled at generating realistic-looking "
-        "mock job postings for the tech industry. Given a specific role, you craft "
-        "a plausible job title, company name, location, salary range, description, "
-        "responsibilities, and qualifications, mimicking the style of real job boards."
-        "You can subtly tailor postings if provided with user skill context."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    llm=llm
-)
+@lru_cache(maxsize=None)
+def get_job_match_generator_agent():
+    Agent = timed_import("crewai").Agent
+    llm = get_llm()
+    with timed("build job_match_generator_agent"):
+        return Agent(
+            role='Mock Job Posting Creator',
+            goal=get_job_match_prompt(),
+            backstory=(
+                "You are a creative AI assistant skilled at generating realistic-looking "
+                "mock job postings for the tech industry. Given a specific role, you craft "
+                "a plausible job title, company name, location, salary range, description, "
+                "responsibilities, and qualifications, mimicking the style of real job boards."
+                "You can subtly tailor postings if provided with user skill context."
+            ),
+            verbose=True,
+            allow_delegation=False,
+            llm=llm
+        )
+
+# Backwards-compatible lazy module attributes
+def __getattr__(name):
+    if name == 'job_match_generator_agent':
+        return get_job_match_generator_agent()
+    if name == 'job_match_prompt':
+        return get_job_match_prompt()
+    if name == 'llm':
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Test Function (Optional) ---
 if __name__ == '__main__':
     test_role = "DevOps Engineer"
+    job_match_generator_agent = get_job_match_generator_agent()
     # Example with no user skills summary
     formatted_goal = job_match_generator_agent.goal.format(role=test_role, user_skills_summary="")
     print(f"Job Match Generator Agent for '{test_role}' initialized.")
@@ -1,45 +1,91 @@
-import os
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from agents.llm_factory import get_agent_llm
 
 load_dotenv()
 
-# --- Instantiate ChatOpenAI ---
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo", # A capable and cost-effective model
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.6, # Balance creativity and relevance for finding resources
-    model_kwargs={"max_concurrency":5}
-)
+# Agent and prompt are built on first use (then memoized) so importing this module stays cheap.
+
+# --- LLM (shared HTTP pool, per-agent sampling settings; see agents/llm_factory.py) ---
+def get_llm():
+    return get_agent_llm('learning_resource')
 
 # --- Load Prompt ---
-try:
-    with open('./prompts/course_prompt.txt', 'r') as f:
-        course_prompt = f.read()
-except FileNotFoundError:
-    print("ERROR: Course prompt file not found.")
-    course_prompt = "Find free online learning resources (Beginner, Intermediate, Advanced) for skill: {skill}." # Fallback
+@lru_cache(maxsize=None)
+def get_course_prompt():
+    try:
+        with open('./prompts/course_prompt.txt', 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print("ERROR: Course prompt file not found.")
+        return "Find free online learning resources (Beginner, Intermediate, Advanced) for skill: {skill}." # Fallback
+
+@lru_cache(maxsize=None)
+def get_course_batch_prompt():
+    """ Multi-skill variant of the course prompt: one answer, a JSON object keyed by skill. """
+    try:
+        with open('./prompts/course_batch_prompt.txt', 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print("ERROR: Course batch prompt file not found.")
+        return "For each listed skill, find free online learning resources with URLs. Output ONLY a JSON object mapping each skill to a list of resources." # Fallback
 
 # --- Create Agent ---
-learning_resource_agent = Agent(
-    role='Free Learning Resource Finder',
-    goal=course_prompt,
-    backstory=(
-        "You are an AI assistant dedicated to helping users learn and grow. "
-        "Your specialty is finding high-quality, free, online learning resources "
-        "(courses, tutorials, documentation) for specific technical skills. "
-        "You categorize resources by difficulty (Beginner, Intermediate, Advanced) "
-        "and provide direct URLs."
-    ),
-    verbose=True,
-    allow_delegation=False,
-    llm=llm
+BACKSTORY = (
+    "You are an AI assistant dedicated to helping users learn and grow. "
+    "Your specialty is finding high-quality, free, online learning resources "
+    "(courses, tutorials, documentation) for specific technical skills. "
+    "You categorize resources by difficulty (Beginner, Intermediate, Advanced) "
+    "and provide direct URLs."
 )
 
+@lru_cache(maxsize=None)
+def get_learning_resource_agent():
+    Agent = timed_import("crewai").Agent
+    llm = get_llm()
+    with timed("build learning_resource_agent"):
+        return Agent(
+            role='Free Learning Resource Finder',
+            goal=get_course_prompt(),
+            backstory=BACKSTORY,
+            verbose=True,
+            allow_delegation=False,
+            llm=llm
+        )
+
+@lru_cache(maxsize=None)
+def get_learning_resource_batch_agent():
+    """ Same finder for several skills at once: its goal is the batch prompt, which asks for a JSON object. """
+    Agent = timed_import("crewai").Agent
+    llm = get_llm()
+    with timed("build learning_resource_batch_agent"):
+        return Agent(
+            role='Free Learning Resource Finder',
+            goal=get_course_batch_prompt(),
+            backstory=BACKSTORY,
+            verbose=True,
+            allow_delegation=False,
+            llm=llm
+        )
+
+# Backwards-compatible lazy module attributes
+def __getattr__(name):
+    if name == 'learning_resource_agent':
+        return get_learning_resource_agent()
+    if name == 'learning_resource_batch_agent':
+        return get_learning_resource_batch_agent()
+    if name == 'course_prompt':
+        return get_course_prompt()
+    if name == 'course_batch_prompt':
+        return get_course_batch_prompt()
+    if name == 'llm':
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # --- Test Function (Optional) ---
 if __name__ == '__main__':
     test_skill = "React Hooks"
-    formatted_goal = learning_resource_agent.goal.format(skill=test_skill)
+    formatted_goal = get_learning_resource_agent().goal.format(skill=test_skill)
     print(f"Learning Resource Agent for '{test_skill}' initialized.")
     print("Formatted Goal Example:", formatted_goal)
\ No newline at end of file
@@ -0,0 +1,156 @@
+# agents/llm_factory.py
+import os
+import threading
+from functools import lru_cache
+from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from crew.resilience import LLM_CALL_TIMEOUT
+
+load_dotenv()
+
+# --- Shared LLM Registry ---
+# All agents share one keep-alive HTTP connection pool (sync + async) to the OpenAI API.
+# Agents differ only in sampling settings, which are handed out per agent name below.
+DEFAULT_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-3.5-turbo")
+
+AGENT_SAMPLING = {
+    'role_definition': {'temperature': 0.7},
+    'baseline_threshold': {'temperature': 0.5},
+    'role_baseline': {'temperature': 0.5}, # Fast path emits the baselines too, so keep the estimator's setting
+    'learning_resource': {'temperature': 0.6}, # Balance creativity and relevance for finding resources
+    'job_match_generator': {'temperature': 0.8}, # Higher temperature for more varied job descriptions
+    'boss': {'temperature': 0.3}, # Low temperature for analytical tasks
+}
+
+POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+# crew.resilience owns retries and per-attempt timeouts, so the SDK must not retry or outwait it
+REQUEST_TIMEOUT = min(HTTP_TIMEOUT, LLM_CALL_TIMEOUT) if LLM_CALL_TIMEOUT > 0 else HTTP_TIMEOUT
+
+_llms = {} # agent name -> ChatOpenAI
+_llms_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_pool_counters = {'sync': {'requests': 0, 'responses': 0, 'errors': 0, 'in_flight': 0},
+                  'async': {'requests': 0, 'responses': 0, 'errors': 0, 'in_flight': 0}}
+
+
+def _count(kind, event, failed=False):
+    with _stats_lock:
+        counters = _pool_counters[kind]
+        if event == 'request':
+            counters['requests'] += 1
+            counters['in_flight'] += 1
+        else:
+            counters['responses' if not failed else 'errors'] += 1
+            counters['in_flight'] -= 1
+
+
+def _pool_limits(httpx):
+    return httpx.Limits(max_connections=POOL_MAX_CONNECTIONS,
+                        max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                        keepalive_expiry=POOL_KEEPALIVE_EXPIRY)
+
+
+@lru_cache(maxsize=None)
+def get_http_client():
+    """ Process-wide pooled, keep-alive httpx.Client used by every agent's blocking calls. """
+    httpx = timed_import("httpx")
+
+    class CountingTransport(httpx.HTTPTransport):
+        def handle_request(self, request):
+            _count('sync', 'request')
+            failed = True
+            try:
+                response = super().handle_request(request)
+                failed = False
+                return response
+            finally:
+                _count('sync', 'response', failed)
+
+    with timed("build shared sync http pool"):
+        return httpx.Client(transport=CountingTransport(limits=_pool_limits(httpx)), timeout=HTTP_TIMEOUT)
+
+
+@lru_cache(maxsize=None)
+def get_async_http_client():
+    """
+    Process-wide pooled, keep-alive httpx.AsyncClient used by every agent's async calls.
+    Async LLM I/O all runs on the advisor event loop (crew.async_runtime), so one pool serves every run.
+    """
+    httpx = timed_import("httpx")
+
+    class CountingAsyncTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            _count('async', 'request')
+            failed = True
+            try:
+                response = await super().handle_async_request(request)
+                failed = False
+                return response
+            finally:
+                _count('async', 'response', failed)
+
+    with timed("build shared async http pool"):
+        return httpx.AsyncClient(transport=CountingAsyncTransport(limits=_pool_limits(httpx)), timeout=HTTP_TIMEOUT)
+
+
+def get_sampling_settings(agent_name):
+    """ Sampling settings (temperature, ...) for a registered agent name. """
+    if agent_name not in AGENT_SAMPLING:
+        raise KeyError(f"Unknown agent '{agent_name}'. Registered: {sorted(AGENT_SAMPLING)}")
+    return dict(AGENT_SAMPLING[agent_name])
+
+
+def get_agent_llm(agent_name):
+    """
+    Memoized ChatOpenAI for one agent: its own sampling settings on the shared HTTP pool. SDK retries are
+    off and the request timeout is capped at LLM_CALL_TIMEOUT; crew.resilience is the only retry layer.
+    """
+    with _llms_lock:
+        if agent_name not in _llms:
+            ChatOpenAI = timed_import("langchain_openai").ChatOpenAI
+            settings = get_sampling_settings(agent_name)
+            with timed(f"build {agent_name} llm"):
+                _llms[agent_name] = ChatOpenAI(
+                    model_name=settings.pop('model_name', DEFAULT_MODEL_NAME),
+                    openai_api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=get_http_client(),
+                    http_async_client=get_async_http_client(),
+                    max_retries=0,
+                    timeout=REQUEST_TIMEOUT,
+                    **settings
+                )
+        return _llms[agent_name]
+
+
+def _connection_stats(client):
+    """ Best-effort open/idle connection counts from httpx's transport pool (internal API, may be absent). """
+    pool = getattr(getattr(client, '_transport', None), '_pool', None)
+    connections = getattr(pool, 'connections', None)
+    if connections is None:
+        return {}
+    connections = list(connections)
+    idle = 0
+    for connection in connections:
+        try:
+            idle += 1 if connection.is_idle() else 0
+        except Exception:
+            pass
+    return {'open_connections': len(connections), 'idle_connections': idle}
+
+
+def pool_stats():
+    """ Request counters and connection-pool occupancy for the shared sync and async HTTP clients. """
+    with _stats_lock:
+        stats = {kind: dict(counters) for kind, counters in _pool_counters.items()}
+    if get_http_client.cache_info().currsize:
+        stats['sync'].update(_connection_stats(get_http_client()))
+    if get_async_http_client.cache_info().currsize:
+        stats['async'].update(_connection_stats(get_async_http_client()))
+    stats['limits'] = {'max_connections': POOL_MAX_CONNECTIONS, 'max_keepalive_connections': POOL_MAX_KEEPALIVE,
+                       'keepalive_expiry_s': POOL_KEEPALIVE_EXPIRY}
+    with _llms_lock:
+        stats['llms'] = sorted(_llms)
+    return stats
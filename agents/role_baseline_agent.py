@@ -0,0 +1,60 @@
+# agents/role_baseline_agent.py
+from functools import lru_cache
+from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from agents.llm_factory import get_agent_llm
+
+load_dotenv()
+
+# Fast-path agent: defines the role's skills and estimates their baselines in one structured answer,
+# replacing the Role Definition -> Baseline Estimator pair on a cold cache. Built on first use.
+
+# --- LLM (shared HTTP pool, per-agent sampling settings; see agents/llm_factory.py) ---
+def get_llm():
+    return get_agent_llm('role_baseline')
+
+# --- Load Prompt ---
+@lru_cache(maxsize=None)
+def get_role_baseline_prompt():
+    try:
+        with open('./prompts/role_baseline_prompt.txt', 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print("ERROR: Role baseline prompt file not found.")
+        return "For tech role {role}, output ONLY a JSON object with keys 'Core Technical Skills', 'Secondary Technical Skills/Tools' and 'Soft Skills', each mapping skill names to baseline proficiency (0-100)." # Fallback
+
+# --- Create Agent ---
+@lru_cache(maxsize=None)
+def get_role_baseline_agent():
+    Agent = timed_import("crewai").Agent
+    llm = get_llm()
+    with timed("build role_baseline_agent"):
+        return Agent(
+            role='Tech Role Skill & Baseline Profiler',
+            goal=get_role_baseline_prompt(),
+            backstory=(
+                "You are an expert AI assistant with deep knowledge of tech industry job requirements. "
+                "Given a tech role, you identify its core technical skills, secondary skills/tools and soft skills, "
+                "and estimate the standard baseline proficiency level (0-100) for each one for someone competent "
+                "in that role. You always answer with a single structured JSON object."
+            ),
+            verbose=True,
+            allow_delegation=False,
+            llm=llm
+        )
+
+# Backwards-compatible lazy module attributes
+def __getattr__(name):
+    if name == 'role_baseline_agent':
+        return get_role_baseline_agent()
+    if name == 'role_baseline_prompt':
+        return get_role_baseline_prompt()
+    if name == 'llm':
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Test Function (Optional) ---
+if __name__ == '__main__':
+    test_role = "Data Scientist"
+    print(f"Role Baseline Agent for '{test_role}' initialized.")
+    print("Goal:", get_role_baseline_agent().goal.format(role=test_role))
\ No newline at end of file
@@ -1,47 +1,62 @@
-import os
-from crewai import Agent
-from langchain_openai import ChatOpenAI
+from functools import lru_cache
 from dotenv import load_dotenv
+from utils.startup_profiler import timed, timed_import
+from agents.llm_factory import get_agent_llm
 
 load_dotenv()
 
-# --- Instantiate ChatOpenAI with Concurrency Limit ---
-# You can customize the model_name and temperature
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo", # A capable and cost-effective model
-    openai_api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.7,
-    model_kwargs={"max_concurrency":5}
-)
+# Agent and prompt are built on first use (then memoized) so importing this module stays cheap.
+
+# --- LLM (shared HTTP pool, per-agent sampling settings; see agents/llm_factory.py) ---
+def get_llm():
+    return get_agent_llm('role_definition')
 
 # --- Load Prompt ---
-try:
-    with open('./prompts/role_definition_prompt.txt', 'r') as f:
-        role_definition_prompt = f.read()
-except FileNotFoundError:
-    print("ERROR: Role definition prompt file not found.")
-    role_definition_prompt = "Define core, secondary, and soft skills for tech role: {role}. Structure the output." # Fallback prompt
+@lru_cache(maxsize=None)
+def get_role_definition_prompt():
+    try:
+        with open('./prompts/role_definition_prompt.txt', 'r') as f:
+            return f.read()
+    except FileNotFoundError:
+        print("ERROR: Role definition prompt file not found.")
+        return "Define core, secondary, and soft skills for tech role: {role}. Structure the output." # Fallback prompt
 
 # --- Create Agent ---
-role_definition_agent = Agent(
-    role='Tech Role Skill Definer',
-    goal=role_definition_prompt, # Use the loaded prompt directly as the goal template
-    backstory=(
-        "You are an expert AI assistant specialized in understanding the tech industry "
-        "and job requirements. Your task is to meticulously analyze a given tech role "
-        "and identify the essential core technical skills, important secondary skills/tools, "
-        "and relevant soft skills required for success in that role. You provide clear, structured output."
-    ),
-    verbose=True, # Enable verbose output for debugging
-    allow_delegation=False, # This agent works independently
-    llm=llm # Assign the specific LLM instance
-)
+@lru_cache(maxsize=None)
+def get_role_definition_agent():
+    Agent = timed_import("crewai").Agent
+    llm = get_llm()
+    with timed("build role_definition_agent"):
+        return Agent(
+            role='Tech Role Skill Definer',
+            goal=get_role_definition_prompt(), # Use the loaded prompt directly as the goal template
+            backstory=(
+                "You are an expert AI assistant specialized in understanding the tech industry "
+                "and job requirements. Your task is to meticulously analyze a given tech role "
+                "and identify the essential core technical skills, important secondary skills/tools, "
+                "and relevant soft skills required for success in that role. You provide clear, structured output."
+            ),
+            verbose=True, # Enable verbose output for debugging
+            allow_delegation=False, # This agent works independently
+            llm=llm # Assign the specific LLM instance
+        )
+
+# Backwards-compatible lazy module attributes (e.g. `from agents.role_definition_agent import role_definition_agent`)
+def __getattr__(name):
+    if name == 'role_definition_agent':
+        return get_role_definition_agent()
+    if name == 'role_definition_prompt':
+        return get_role_definition_prompt()
+    if name == 'llm':
+        return get_llm()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # --- Test Function (Optional) ---
 if __name__ == '__main__':
     # Example usage for testing this agent directly
     test_role = "Data Scientist"
-    task_description = role_definition_prompt.format(role=test_role) # Format the prompt for a test task
+    role_definition_agent = get_role_definition_agent()
+    task_description = get_role_definition_prompt().format(role=test_role) # Format the prompt for a test task
 
     # Create a Task (not strictly needed for agent definition, but shows usage)
     from crewai import Task
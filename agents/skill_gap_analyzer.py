@@ -8,45 +8,50 @@ class SkillGapAnalyzerAgent:
     def __init__(self):
         print("Skill Gap Analyzer Agent initialized (Computational).")
 
-    def analyze_gaps(self, user_skills_lower, baseline_skills_original):
+    def analyze_gaps(self, user_skills_lower, baseline_skills_original, return_mapping=False):
         """
         Compares user skills proficiency against baseline proficiency (Case-Insensitive Keys).
-        Uses robust fuzzy_skill_match to ensure a baseline is only missing if no mapped user skill covers it.
+        Uses the baseline's SkillIndex (same mapping as fuzzy_skill_match) to ensure a baseline is only missing if no mapped user skill covers it.
 
         Args:
             user_skills_lower (dict): {skill_name_lower: proficiency} - From user input.
             baseline_skills_original (dict): {Skill_Name_Original_Case: proficiency} - From AI.
+            return_mapping (bool): Also return the skill mapping used ({baseline_skill: user_skill or None}).
 
         Returns:
             dict: {'missing': [Skill_Name_Original_Case],
                    'weak': [{'skill': Skill_Name_Original_Case, 'user': N, 'baseline': N, 'gap': N}]}
                    Returns None if inputs are invalid. Returns empty lists if no gaps.
+                   With return_mapping, a (gaps, mapping) tuple; mapping is {} when no mapping was computed.
         """
         if not isinstance(user_skills_lower, dict) or not isinstance(baseline_skills_original, dict):
             print("ERROR: Invalid input format for skill gap analysis.")
-            return {'missing': [], 'weak': [], 'error': 'Invalid input format'}
+            gaps = {'missing': [], 'weak': [], 'error': 'Invalid input format'}
+            return (gaps, {}) if return_mapping else gaps
 
         # Handle empty baseline case
         if not baseline_skills_original:
              print("WARNING: Baseline skills dictionary is empty. Cannot perform gap analysis.")
-             return {'missing': [], 'weak': [], 'info': 'Baseline skills unavailable'}
+             gaps = {'missing': [], 'weak': [], 'info': 'Baseline skills unavailable'}
+             return (gaps, {}) if return_mapping else gaps
 
         # --- Robust mapping: Use fuzzy_skill_match to map user skills to baseline ---
-        from utils.agent_helpers import fuzzy_skill_match, normalize_text
+        from utils.skill_index import get_skill_index
+        from utils.skill_taxonomy import taxonomy_key # Keeps C, C++ and C# apart, unlike normalize_text
         user_skill_names = list(user_skills_lower.keys())
         baseline_names = list(baseline_skills_original.keys())
-        mapping = fuzzy_skill_match(user_skill_names, baseline_names, threshold=80)
+        # The index for this baseline is built once and reused by every run/rerun against it
+        mapping = get_skill_index(baseline_names).match(user_skill_names, threshold=80)
         # mapping: {baseline_skill: user_skill or None}
 
         # Build reverse: for each baseline, did any user skill map to it?
         covered_baselines = set()
-        user_skill_to_level = {normalize_text(k): v for k, v in user_skills_lower.items()}
         for baseline_skill, user_skill in mapping.items():
             if user_skill is not None:
-                covered_baselines.add(normalize_text(baseline_skill))
+                covered_baselines.add(taxonomy_key(baseline_skill))
 
         # Lowercase mapping for baseline
-        baseline_lower_map = {normalize_text(k): k for k in baseline_skills_original.keys()}
+        baseline_lower_map = {taxonomy_key(k): k for k in baseline_skills_original.keys()}
         gaps = {'missing': [], 'weak': []}
 
         # Find missing skills (those not covered by any mapped user skill)
@@ -60,7 +65,7 @@ class SkillGapAnalyzerAgent:
                 # Find which user skill mapped to this baseline
                 mapped_user_skill = mapping.get(original_baseline)
                 if mapped_user_skill is not None:
-                    user_level = user_skills_lower.get(mapped_user_skill.lower(), user_skills_lower.get(normalize_text(mapped_user_skill), 0))
+                    user_level = user_skills_lower.get(mapped_user_skill.lower(), user_skills_lower.get(taxonomy_key(mapped_user_skill), 0))
                     baseline_level = baseline_skills_original[original_baseline]
                     try:
                         user_level_num = int(user_level)
@@ -77,4 +82,135 @@ class SkillGapAnalyzerAgent:
                          # Optionally add this as an issue?
 
         print(f"Skill Gap Analysis complete. Missing: {len(gaps['missing'])}, Weak: {len(gaps['weak'])}")
-        return gaps
\ No newline at end of file
+        return (gaps, mapping) if return_mapping else gaps
+
+    def analyze_cohort(self, cohort, baseline_skills_original):
+        """
+        Gap analysis for a whole cohort against one role baseline, in one vectorized pass.
+
+        Each distinct skill name in the cohort is mapped to the baseline once (same tiers as analyze_gaps),
+        then levels are scattered into a (learners x baseline skills) float32 matrix (NaN = not covered) and
+        compared against the baseline vector. When several of a learner's skills map to the same baseline
+        skill, the highest rating counts.
+
+        Args:
+            cohort (dict or list): {learner_id: {skill_name: proficiency}}, or a list of such dicts (ids are indexes).
+            baseline_skills_original (dict): {Skill_Name_Original_Case: proficiency} - From AI.
+
+        Returns:
+            dict: {'learners': {learner_id: {'missing': [...], 'weak': [{'skill', 'user', 'baseline', 'gap'}]}},
+                   'skills': {Skill: {'baseline', 'missing_count', 'weak_count', 'gap_rate', 'mean_level', 'mean_gap', 'max_gap'}},
+                   'cohort_size': N}
+        """
+        import numpy as np # Deferred: only cohort analysis needs it, and this module is on the startup path
+        profiles = cohort if isinstance(cohort, dict) else dict(enumerate(cohort or []))
+        if not isinstance(baseline_skills_original, dict) or not all(isinstance(p, dict) for p in profiles.values()):
+            print("ERROR: Invalid input format for cohort gap analysis.")
+            return {'learners': {}, 'skills': {}, 'cohort_size': 0, 'error': 'Invalid input format'}
+        if not baseline_skills_original:
+            print("WARNING: Baseline skills dictionary is empty. Cannot perform cohort gap analysis.")
+            return {'learners': {}, 'skills': {}, 'cohort_size': len(profiles), 'info': 'Baseline skills unavailable'}
+
+        from utils.skill_index import get_skill_index
+        baseline_names = list(baseline_skills_original.keys())
+        column_of = {name: column for column, name in enumerate(baseline_names)}
+        try:
+            baseline = np.array([int(baseline_skills_original[name]) for name in baseline_names], dtype=np.float32)
+        except (ValueError, TypeError) as e:
+            print(f"ERROR: Baseline proficiencies must be numeric for cohort gap analysis: {e}")
+            return {'learners': {}, 'skills': {}, 'cohort_size': len(profiles), 'error': 'Invalid baseline levels'}
+
+        # Map every distinct user skill name once for the whole cohort (one batched semantic pass)
+        distinct_names = list(dict.fromkeys(skill for profile in profiles.values() for skill in profile))
+        targets = get_skill_index(baseline_names).targets(distinct_names, threshold=80)
+        name_to_column = {name: column_of[target] for name, (target, _) in zip(distinct_names, targets) if target is not None}
+
+        # Scatter ratings into the learners x baseline-skills matrix
+        learner_ids = list(profiles.keys())
+        rows, columns, levels = [], [], []
+        for row, learner_id in enumerate(learner_ids):
+            for skill, level in profiles[learner_id].items():
+                column = name_to_column.get(skill)
+                if column is None:
+                    continue
+                try:
+                    levels.append(float(int(level)))
+                except (ValueError, TypeError):
+                    print(f"WARNING: Ignoring non-numeric level {level!r} for '{skill}' (learner {learner_id}).")
+                    continue
+                rows.append(row)
+                columns.append(column)
+        matrix = np.full((len(learner_ids), len(baseline_names)), np.nan, dtype=np.float32)
+        np.fmax.at(matrix, (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)), np.array(levels, dtype=np.float32))
+
+        missing = np.isnan(matrix)
+        gaps = np.where(missing, 0.0, baseline - np.nan_to_num(matrix))
+        weak = gaps > 0 # Covered but below baseline
+        gaps = np.where(weak, gaps, 0.0)
+
+        learners = {learner_id: {'missing': [], 'weak': []} for learner_id in learner_ids}
+        for row, column in zip(*np.nonzero(missing)):
+            learners[learner_ids[row]]['missing'].append(baseline_names[column])
+        for row, column in zip(*np.nonzero(weak)):
+            learners[learner_ids[row]]['weak'].append({
+                'skill': baseline_names[column],
+                'user': int(matrix[row, column]),
+                'baseline': int(baseline[column]),
+                'gap': int(gaps[row, column])
+            })
+
+        # Per-skill aggregates across the cohort
+        covered_counts = (~missing).sum(axis=0)
+        weak_counts = weak.sum(axis=0)
+        missing_counts = missing.sum(axis=0)
+        level_sums = np.nansum(matrix, axis=0)
+        gap_sums = gaps.sum(axis=0)
+        max_gaps = gaps.max(axis=0) if len(learner_ids) else np.zeros(len(baseline_names))
+        cohort_size = len(learner_ids)
+        skills = {}
+        for column, name in enumerate(baseline_names):
+            skills[name] = {
+                'baseline': int(baseline[column]),
+                'missing_count': int(missing_counts[column]),
+                'weak_count': int(weak_counts[column]),
+                'gap_rate': round(float(missing_counts[column] + weak_counts[column]) / cohort_size, 3) if cohort_size else 0.0,
+                'mean_level': round(float(level_sums[column] / covered_counts[column]), 1) if covered_counts[column] else None,
+                'mean_gap': round(float(gap_sums[column] / weak_counts[column]), 1) if weak_counts[column] else 0.0,
+                'max_gap': int(max_gaps[column]),
+            }
+
+        print(f"Cohort Gap Analysis complete. Learners: {cohort_size}, Baseline skills: {len(baseline_names)}, "
+              f"Missing: {int(missing_counts.sum())}, Weak: {int(weak_counts.sum())}")
+        return {'learners': learners, 'skills': skills, 'cohort_size': cohort_size}
+
+
+# --- Benchmark: per-learner analyze_gaps loop vs. analyze_cohort ---
+if __name__ == '__main__':
+    import random
+    import time
+
+    random.seed(3)
+    baseline = {"Python": 80, "SQL": 75, "Statistics": 70, "Machine Learning": 70, "Data Visualization": 65,
+                "Communication": 70, "Git": 60, "Pandas": 75, "Deep Learning": 55, "Cloud Platforms": 50}
+    variants = {"Python": ["python", "python 3"], "SQL": ["sql", "postgresql"], "Machine Learning": ["ml", "machine learning"],
+                "Data Visualization": ["data viz", "tableau"], "Communication": ["communication"], "Git": ["git", "github"],
+                "Pandas": ["pandas"], "Statistics": ["statistics", "stats"], "Deep Learning": ["deep learning", "pytorch"],
+                "Cloud Platforms": ["aws", "cloud"]}
+    cohort = {f"learner-{i}": {random.choice(variants[skill]): random.randrange(0, 101, 5)
+                               for skill in random.sample(list(baseline), random.randint(3, 9))}
+              for i in range(500)}
+    analyzer = SkillGapAnalyzerAgent()
+    import contextlib, io
+    with contextlib.redirect_stdout(io.StringIO()): # Silence per-learner logging
+        started = time.perf_counter()
+        looped = {learner_id: analyzer.analyze_gaps(profile, baseline) for learner_id, profile in cohort.items()}
+        loop_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        batched = analyzer.analyze_cohort(cohort, baseline)
+        cohort_ms = (time.perf_counter() - started) * 1000
+    agree = sum(sorted(looped[learner_id]['missing']) == sorted(batched['learners'][learner_id]['missing']) and
+                sorted(item['skill'] for item in looped[learner_id]['weak']) == sorted(item['skill'] for item in batched['learners'][learner_id]['weak'])
+                for learner_id in cohort)
+    print(f"{len(cohort)} learners: loop {loop_ms:.1f} ms, cohort {cohort_ms:.1f} ms; identical gaps for {agree}/{len(cohort)}")
+    for skill, stats in sorted(batched['skills'].items(), key=lambda item: -item[1]['gap_rate'])[:5]:
+        print(f"  {skill:20} {stats}")
\ No newline at end of file
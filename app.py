@@ -1,16 +1,18 @@
 # app.py (Lowercase Standardization Version)
 
 import streamlit as st
-import plotly.graph_objects as go
 import time
+from utils.startup_profiler import timed, mark, print_startup_report
 
-# Import backend function
-from crew.crew_setup import run_tech_advisor_crew # Assumes crew_setup expects lowercase keys if it uses them
+# Import backend function (agents, LLM clients, crewai and plotly load lazily on first use)
+with timed("import app modules"):
+    from crew.crew_setup import recompute_tech_advisor_results, recommend_roles # Assumes crew_setup expects lowercase keys if it uses them
+    from crew.jobs import advisor_jobs, FINISHED_STATES, DONE, FAILED
 
-# Import helpers and formatters
-from utils.streamlit_helper import inject_custom_css, render_skill_sliders
-from utils.formatters import create_radar_chart, format_learning_path, format_job_card # Will update create_radar_chart
-from utils.agent_helpers import fuzzy_skill_match
+    # Import helpers and formatters
+    from utils.streamlit_helper import inject_custom_css, render_skill_sliders
+    from utils.formatters import create_radar_chart, format_learning_path, format_job_card # Will update create_radar_chart
+    from utils.agent_helpers import fuzzy_skill_match
 
 # --- Page Configuration ---
 st.set_page_config(page_title="JobNexus - AI Career Advisor", layout="wide")
@@ -28,6 +30,8 @@ if 'results' not in st.session_state: st.session_state.results = None
 if 'raw_skills_input' not in st.session_state: st.session_state.raw_skills_input = ""
 # entered_skills will store unique lowercase skills
 if 'entered_skills' not in st.session_state: st.session_state.entered_skills = []
+# Id of this session's background advisor run (the job itself lives in crew.jobs, outside the session)
+if 'advisor_job_id' not in st.session_state: st.session_state.advisor_job_id = None
 
 # --- Sidebar ---
 with st.sidebar:
@@ -80,197 +84,302 @@ with st.sidebar:
         st.session_state.raw_skills_input = ""
         st.session_state.entered_skills = []
         st.session_state.results = None
+        if st.session_state.advisor_job_id: advisor_jobs.cancel(st.session_state.advisor_job_id)
+        st.session_state.advisor_job_id = None
         st.rerun()
 
+# --- Rerun Memoization ---
+# Streamlit re-executes this script on every widget interaction; skill mapping and radar construction are
+# memoized by argument content (bounded, least-recently-used entries evicted) so unchanged inputs cost nothing.
+RERUN_CACHE_ENTRIES = 64
+
+@st.cache_data(max_entries=RERUN_CACHE_ENTRIES, show_spinner=False)
+def cached_skill_mapping(user_skill_names, baseline_names):
+    return fuzzy_skill_match(list(user_skill_names), list(baseline_names))
+
+@st.cache_data(max_entries=RERUN_CACHE_ENTRIES, show_spinner=False)
+def cached_radar_figure(user_rated_skills_lower, baseline, gaps, mapping):
+    """ (radar figure or None, baseline filtered to the user's mapped skills); keys are lowercased as before. """
+    # Build mapped user skills dict for radar/gap
+    mapped_user_skills = {}
+    for baseline_skill, user_skill in mapping.items():
+        if user_skill is not None and user_skill in user_rated_skills_lower:
+            mapped_user_skills[baseline_skill] = user_rated_skills_lower[user_skill]
+    user_rated_skills_lower = {k.lower(): v for k, v in mapped_user_skills.items()}
+
+    # Filter baseline to include only keys matching user's lowercase keys
+    baseline_lower_map = {k.lower(): k for k in baseline.keys()}
+    filtered_baseline_original_case = {}
+    for user_skill_lower in user_rated_skills_lower.keys():
+        if user_skill_lower in baseline_lower_map:
+            original_baseline_key = baseline_lower_map[user_skill_lower]
+            filtered_baseline_original_case[original_baseline_key] = baseline[original_baseline_key]
+    if not filtered_baseline_original_case:
+        return None, {}
+    print(f"Plotting radar for: {list(filtered_baseline_original_case.keys())}")
+    # Pass lowercase user skills, original case baseline (filtered), original case gaps
+    return create_radar_chart(user_rated_skills_lower, filtered_baseline_original_case, gaps), filtered_baseline_original_case
+
+
+# --- Result Renderers (one per tab; safe to call with partial results) ---
+def render_skill_radar(results):
+    st.subheader("Your Skill Proficiency Overview")
+    st.caption("Comparing your self-assessed skills against the typical baseline for the skills you entered.")
+    baseline = results.get('baseline_thresholds', {}) # Assumes original case keys from AI
+    gaps = results.get('skill_gaps', {}) # Assumes original case keys in 'missing'/'weak' lists/dicts
+    # user_rated_skills keys are lowercase
+    user_rated_skills_lower = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
+
+    if baseline and user_rated_skills_lower:
+        # Reuse the backend's mapping when it was computed for these same skills; otherwise map (memoized)
+        mapping = results.get('skill_mapping')
+        analyzed_skills = results.get('user_skills')
+        if not mapping or (analyzed_skills is not None and set(analyzed_skills) != set(user_rated_skills_lower)):
+            mapping = cached_skill_mapping(tuple(user_rated_skills_lower), tuple(baseline))
+        radar_fig, filtered_baseline_original_case = cached_radar_figure(user_rated_skills_lower, baseline, gaps or {}, mapping)
+
+        if filtered_baseline_original_case:
+            if radar_fig:
+                st.plotly_chart(radar_fig, use_container_width=True)
+            else:
+                st.warning("Could not generate skill radar chart.")
+        else:
+            st.info("ℹ️ None of the skills you entered match the baseline skills identified for this role by the AI.")
+            st.markdown("**Baseline skills identified by AI:**")
+            for skill in baseline.keys():
+                st.markdown(f"- {skill}")
+    elif not user_rated_skills_lower: st.warning("Please enter and rate your skills.")
+    else: st.warning("Baseline skill data not available.")
+
+
+def render_role_recommendations(results):
+    """ Known roles closest to the user's ratings, from cached baselines (no LLM calls). """
+    rated_skills = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
+    recommendations = recommend_roles(rated_skills, top_k=5) if rated_skills else []
+    if len(recommendations) > 1:
+        st.markdown("**Roles closest to your current profile:**")
+        for item in recommendations:
+            st.markdown(f"- {item['role'].title()}: {item['fit'] * 100:.0f}% of baseline met ({item['total_gap']:.0f} points to go)")
+
+
+def render_learning_path(results):
+    st.subheader("Personalized Learning Roadmap")
+    # Summary of missing skills
+    gaps = results.get('skill_gaps', {})
+    missing = gaps.get('missing', [])
+    weak_items = gaps.get('weak', [])
+    gap_skills = missing + [item['skill'] for item in weak_items]
+    if not gap_skills:
+        st.success("✅ Great news! Your skills meet or exceed the baseline.")
+    else:
+        top_skills = gap_skills[:5]
+        st.markdown(f"**You’re missing {len(gap_skills)} key skill(s). Here are free courses to get you job‑ready in {', '.join(top_skills)}.**")
+        resources = results.get('learning_resources', {})
+        if resources:
+            skills = list(resources.keys())
+            main_skills = skills[:3]
+            extra_skills = skills[3:]
+            for skill in main_skills:
+                with st.expander(f"▶ {skill}"):
+                    resource_output = resources.get(skill)
+                    # Filter out agent fallback/template outputs
+                    if not resource_output or any(x in str(resource_output).lower() for x in ["provide only the structured list", "i now can give a great answer", "no specific free resources"]):
+                        st.info("No actionable resources found for this skill.")
+                        continue
+                    if isinstance(resource_output, str):
+                        st.markdown(resource_output)
+                    else:
+                        st.markdown(str(resource_output))
+            if extra_skills:
+                with st.expander("Show More Skills"):
+                    for skill in extra_skills:
+                        st.markdown(f"**{skill}**")
+                        resource_output = resources.get(skill)
+                        # Filter out agent fallback/template outputs
+                        if not resource_output or any(x in str(resource_output).lower() for x in ["provide only the structured list", "i now can give a great answer", "no specific free resources"]):
+                            st.info("No actionable resources found for this skill.")
+                            continue
+                        if isinstance(resource_output, str):
+                            st.markdown(resource_output)
+                        else:
+                            st.markdown(str(resource_output))
+        else:
+            st.info("No learning resources available.")
+
+
+def render_job_matches(results):
+    st.subheader("Example Job Opportunities")
+    st.caption("AI-generated mock job postings relevant to your goal.")
+    job_posting = results.get('job_posting')
+    if job_posting and not str(job_posting).startswith("Error") and not any(x in str(job_posting).lower() for x in ["i now can give a great answer"]):
+        if isinstance(job_posting, str):
+            st.markdown(job_posting)
+        else:
+            st.markdown(str(job_posting))
+    else:
+        st.warning("No actionable mock job posting was generated.")
+
+
+def render_agent_feedback(results):
+    st.subheader("Analysis Quality & Feedback")
+    validation = results.get('validation', {})
+    gaps = results.get('skill_gaps', {})
+
+    # Display Validation section
+    if validation:
+        # ... (Validation metric, progress, status - same as before) ...
+        confidence = validation.get('confidence_score', 0.0); issues = validation.get('issues', []); is_valid = validation.get('is_valid', False)
+        st.metric("Analysis Consistency Score", f"{confidence*100:.0f}%"); st.progress(confidence)
+        if not issues and confidence > 0.8: st.success("✅ Analysis complete. Results look consistent.")
+        elif issues or confidence <= 0.5: st.error(f"❌ Analysis completed with {len(issues)} issue(s).")
+        else: st.warning(f"⚠️ Analysis complete, confidence moderate or minor issues ({len(issues)} issue(s)).")
+        if issues: st.subheader("Detected Issues / Areas for Caution:"); [st.markdown(f"- {issue}") for issue in issues]; st.markdown("---")
+
+    call_stats = results.get('call_stats') or {}
+    if call_stats.get('retries') or call_stats.get('hedges') or call_stats.get('timeouts'):
+        st.caption(f"LLM calls: {call_stats.get('calls', 0)} · retries: {call_stats.get('retries', 0)} · "
+                   f"timeouts: {call_stats.get('timeouts', 0)} · hedged: {call_stats.get('hedges', 0)} ({call_stats.get('hedge_wins', 0)} won)")
+
+    # Display Skill Gap Summary section
+    st.subheader("Skill Gap Summary:")
+    if gaps and isinstance(gaps, dict) and not gaps.get('error'):
+        weak_skills = gaps.get('weak', []) # List of dicts with original case 'skill' key
+        missing_skills = gaps.get('missing', []) # List of original case skill names
+
+        # Display Weak Skills
+        if weak_skills:
+            st.markdown("**Skills Below Baseline:**")
+            for item in sorted(weak_skills, key=lambda x: x['skill']): st.markdown(f"- Improve **{item['skill']}** by **{item['gap']}** points (Your score: {item['user']}, Baseline: {item['baseline']}).")
+        else:
+            if not missing_skills: st.success("✅ Great news! Your listed skills meet or exceed the baseline requirements!")
+            else: st.markdown("**Skills Below Baseline:** None")
+        st.markdown("---")
+
+        # Display Missing Skills
+        if missing_skills:
+            st.markdown("**Missing Baseline Skills:**"); st.markdown(f"Consider acquiring these skills relevant to a {career_goal or 'target role'}:")
+            num_missing_cols = 3 if len(missing_skills) > 5 else 2 if len(missing_skills) > 2 else 1; cols = st.columns(num_missing_cols); col_index = 0
+            for skill in sorted(missing_skills):
+                with cols[col_index % num_missing_cols]: st.markdown(f"- **{skill}**"); col_index += 1
+        else:
+            if not weak_skills: pass
+            else: st.markdown("**Missing Baseline Skills:** None")
+    elif gaps and gaps.get('error'): st.warning(f"Could not display skill gap summary: {gaps['error']}")
+    else:
+        if not validation or not validation.get('is_valid', True): st.warning("Skill gap summary unavailable due to analysis issues.")
+        else: st.info("No skill gap data available.")
+
+    if not validation:
+        if results.get('error'): st.error(f"Validation could not be performed: {results['error']}")
+        else: st.warning("Validation feedback not available.")
+
+
 # --- Main Area ---
+TAB_TITLES = ["📊 Skill Radar", "📚 Learning Path", "💼 Job Matches", "🧐 Agent Feedback"]
+
+def create_result_tabs():
+    try: return st.tabs(TAB_TITLES)
+    except Exception as e: st.error(f"Error creating tabs: {e}."); return st, st, st, st
+
 if generate_button:
     # Validation checks (remain the same)
     if not career_goal: st.error("⚠️ Please enter your target career role.")
     elif not st.session_state.entered_skills: st.warning("⚠️ Please enter at least one skill.")
     elif not st.session_state.user_skills or not any(skill in st.session_state.user_skills for skill in st.session_state.entered_skills): st.warning("⚠️ Please rate the skills you entered.")
     else:
-        # Proceed with analysis
-        with st.spinner("🧠 Your AI advisor crew is analyzing your profile..."):
-            try:
-                # Prepare skills_to_send - keys are already lowercase
-                skills_to_send = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
-                if not skills_to_send:
-                     st.warning("No valid skill ratings found.")
-                     st.session_state.results = None
-                else:
-                     print(f"Running crew for role '{career_goal}' with skills: {skills_to_send}")
-                     results = run_tech_advisor_crew(career_goal, skills_to_send) # Send lowercase keys
-                     st.session_state.results = results
-                     print("Crew run finished.")
-            except Exception as e:
-                st.error(f"❌ An error occurred during analysis: {e}")
-                import traceback; traceback.print_exc()
-                st.session_state.results = {'error': str(e)}
+        # Prepare skills_to_send - keys are already lowercase
+        skills_to_send = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
+        if not skills_to_send:
+             st.warning("No valid skill ratings found.")
+             st.session_state.results = None
+        else:
+             # The run executes in the background job manager; this script only keeps its id and polls it
+             if st.session_state.advisor_job_id: advisor_jobs.cancel(st.session_state.advisor_job_id) # Resubmission replaces the old run
+             print(f"Submitting crew run for role '{career_goal}' with skills: {skills_to_send}")
+             st.session_state.results = None
+             st.session_state.advisor_job_id = advisor_jobs.submit(career_goal, skills_to_send) # Send lowercase keys
+
+# --- Background Run Progress ---
+JOB_POLL_SECONDS = 1.0
+
+def render_job_progress():
+    """ Polls this session's advisor job and renders its partial results; hands finished results to the display path. """
+    job = advisor_jobs.get(st.session_state.advisor_job_id) if st.session_state.advisor_job_id else None
+    if job is None or job['status'] in FINISHED_STATES:
+        st.session_state.advisor_job_id = None
+        if job and job['status'] == DONE: st.session_state.results = job['results']
+        elif job and job['status'] == FAILED: st.session_state.results = {'error': job['error']}
+        st.rerun() # Full rerun: the normal results display takes over
+
+    partial_results = job['results']
+    label = "🧠 Your AI advisor crew is analyzing your profile..." if job['status'] != 'queued' else "⏳ Waiting for a free advisor slot..."
+    with st.status(f"{label} ({job['elapsed']:.0f}s)", expanded=False) as status:
+        for step in job['progress']: status.write(f"✔️ {step}")
+    if st.button("Cancel analysis", key="cancel_job_button"):
+        advisor_jobs.cancel(job['id'])
+
+    tab1, tab2, tab3, tab4 = create_result_tabs()
+    with tab1:
+        # Baseline and gaps are both in once the gaps arrive: the radar can render then
+        if partial_results.get('skill_gaps') is not None: render_skill_radar(partial_results)
+        else: st.info("⏳ Estimating baseline proficiency for this role...")
+    with tab2:
+        if partial_results.get('skill_gaps') is not None: render_learning_path(partial_results)
+        else: st.info("⏳ Waiting for skill gap analysis...")
+    with tab3:
+        if partial_results.get('job_posting'): render_job_matches(partial_results)
+        else: st.info("⏳ Generating a mock job posting...")
+    with tab4: st.info("⏳ Validation runs once all agents finish...")
+
+    if not hasattr(st, 'fragment'): # Older Streamlit: poll by re-running the whole script
+        time.sleep(JOB_POLL_SECONDS)
+        st.rerun()
+
+if hasattr(st, 'fragment'): # Re-runs only the progress view on a timer; the rest of the page stays interactive
+    render_job_progress = st.fragment(run_every=JOB_POLL_SECONDS)(render_job_progress)
+
+if st.session_state.advisor_job_id:
+    render_job_progress()
+
+# --- What-If Updates ---
+# Slider changes after a run re-score the gaps against that run's baseline (milliseconds) instead of
+# re-running the crew; only skills that newly become gaps have resources looked up.
+if st.session_state.results and not generate_button:
+    previous_results = st.session_state.results
+    rated_skills = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
+    if (rated_skills and previous_results.get('baseline_thresholds') and previous_results.get('role') == career_goal
+            and rated_skills != previous_results.get('user_skills')):
+        with st.spinner("Updating your skill gaps..."):
+            st.session_state.results = recompute_tech_advisor_results(previous_results, rated_skills)
 
 # --- Display Results ---
 if st.session_state.results:
     results = st.session_state.results
     if results.get('error') and 'validation' not in results: st.error(f"❌ Failed to generate advice: {results['error']}")
     elif isinstance(results, dict):
-        tab_titles = ["📊 Skill Radar", "📚 Learning Path", "💼 Job Matches", "🧐 Agent Feedback"]
-        try: tab1, tab2, tab3, tab4 = st.tabs(tab_titles)
-        except Exception as e: st.error(f"Error creating tabs: {e}."); tab1 = tab2 = tab3 = tab4 = st
+        # Only the selected view is rendered: st.tabs would build every tab's content on every rerun
+        active_tab = st.radio("Result view", TAB_TITLES, horizontal=True, key="active_result_tab", label_visibility="collapsed")
 
         # Tab 1: Skill Radar (Filtered using lowercase)
-        with tab1:
-            st.subheader("Your Skill Proficiency Overview")
-            st.caption("Comparing your self-assessed skills against the typical baseline for the skills you entered.")
-            baseline = results.get('baseline_thresholds', {}) # Assumes original case keys from AI
-            gaps = results.get('skill_gaps', {}) # Assumes original case keys in 'missing'/'weak' lists/dicts
-            # user_rated_skills keys are lowercase
-            user_rated_skills_lower = {skill: level for skill, level in st.session_state.user_skills.items() if skill in st.session_state.entered_skills}
-            # Fuzzy map user skills to baseline
-            if baseline and user_rated_skills_lower:
-                mapping = fuzzy_skill_match(list(user_rated_skills_lower.keys()), list(baseline.keys()))
-                # Build mapped user skills dict for radar/gap
-                mapped_user_skills = {}
-                for baseline_skill, user_skill in mapping.items():
-                    if user_skill is not None and user_skill in user_rated_skills_lower:
-                        mapped_user_skills[baseline_skill] = user_rated_skills_lower[user_skill]
-                user_rated_skills_lower = {k.lower(): v for k, v in mapped_user_skills.items()}
-
-            if baseline and user_rated_skills_lower:
-                # Create lowercase mapping for baseline keys for filtering comparison
-                baseline_lower_map = {k.lower(): k for k in baseline.keys()}
-
-                # Filter baseline to include only keys matching user's lowercase keys
-                filtered_baseline_original_case = {}
-                for user_skill_lower in user_rated_skills_lower.keys():
-                    if user_skill_lower in baseline_lower_map:
-                        original_baseline_key = baseline_lower_map[user_skill_lower]
-                        filtered_baseline_original_case[original_baseline_key] = baseline[original_baseline_key]
-
-                if filtered_baseline_original_case:
-                    print(f"Plotting radar for: {list(filtered_baseline_original_case.keys())}")
-                    # Pass lowercase user skills, original case baseline (filtered), original case gaps
-                    radar_fig = create_radar_chart(user_rated_skills_lower, filtered_baseline_original_case, gaps)
-                    if radar_fig:
-                        st.plotly_chart(radar_fig, use_container_width=True)
-                    else:
-                        st.warning("Could not generate skill radar chart.")
-                else:
-                    st.info("ℹ️ None of the skills you entered match the baseline skills identified for this role by the AI.")
-                    if baseline:
-                        st.markdown("**Baseline skills identified by AI:**")
-                        for skill in baseline.keys():
-                            st.markdown(f"- {skill}")
-            elif not user_rated_skills_lower: st.warning("Please enter and rate your skills.")
-            else: st.warning("Baseline skill data not available.")
+        if active_tab == TAB_TITLES[0]:
+            render_skill_radar(results)
+            render_role_recommendations(results)
 
         # Tab 2: Learning Path
-        with tab2:
-            st.subheader("Personalized Learning Roadmap")
-            # Summary of missing skills
-            gaps = results.get('skill_gaps', {})
-            missing = gaps.get('missing', [])
-            weak_items = gaps.get('weak', [])
-            gap_skills = missing + [item['skill'] for item in weak_items]
-            if not gap_skills:
-                st.success("✅ Great news! Your skills meet or exceed the baseline.")
-            else:
-                top_skills = gap_skills[:5]
-                st.markdown(f"**You’re missing {len(gap_skills)} key skill(s). Here are free courses to get you job‑ready in {', '.join(top_skills)}.**")
-                resources = results.get('learning_resources', {})
-                if resources:
-                    skills = list(resources.keys())
-                    main_skills = skills[:3]
-                    extra_skills = skills[3:]
-                    for skill in main_skills:
-                        with st.expander(f"▶ {skill}"):
-                            resource_output = resources.get(skill)
-                            # Filter out agent fallback/template outputs
-                            if not resource_output or any(x in str(resource_output).lower() for x in ["provide only the structured list", "i now can give a great answer", "no specific free resources"]):
-                                st.info("No actionable resources found for this skill.")
-                                continue
-                            if isinstance(resource_output, str):
-                                st.markdown(resource_output)
-                            else:
-                                st.markdown(str(resource_output))
-                    if extra_skills:
-                        with st.expander("Show More Skills"):
-                            for skill in extra_skills:
-                                st.markdown(f"**{skill}**")
-                                resource_output = resources.get(skill)
-                                # Filter out agent fallback/template outputs
-                                if not resource_output or any(x in str(resource_output).lower() for x in ["provide only the structured list", "i now can give a great answer", "no specific free resources"]):
-                                    st.info("No actionable resources found for this skill.")
-                                    continue
-                                if isinstance(resource_output, str):
-                                    st.markdown(resource_output)
-                                else:
-                                    st.markdown(str(resource_output))
-                else:
-                    st.info("No learning resources available.")
+        elif active_tab == TAB_TITLES[1]: render_learning_path(results)
 
         # Tab 3: Job Matches
-        with tab3:
-            st.subheader("Example Job Opportunities")
-            st.caption("AI-generated mock job postings relevant to your goal.")
-            job_posting = results.get('job_posting')
-            if job_posting and not str(job_posting).startswith("Error") and not any(x in str(job_posting).lower() for x in ["i now can give a great answer"]):
-                if isinstance(job_posting, str):
-                    st.markdown(job_posting)
-                else:
-                    st.markdown(str(job_posting))
-            else:
-                st.warning("No actionable mock job posting was generated.")
+        elif active_tab == TAB_TITLES[2]: render_job_matches(results)
 
         # Tab 4: Agent Feedback (Uses original case keys from gaps)
-        with tab4:
-            st.subheader("Analysis Quality & Feedback")
-            validation = results.get('validation', {})
-            gaps = results.get('skill_gaps', {})
-
-            # Display Validation section
-            if validation:
-                # ... (Validation metric, progress, status - same as before) ...
-                confidence = validation.get('confidence_score', 0.0); issues = validation.get('issues', []); is_valid = validation.get('is_valid', False)
-                st.metric("Analysis Consistency Score", f"{confidence*100:.0f}%"); st.progress(confidence)
-                if not issues and confidence > 0.8: st.success("✅ Analysis complete. Results look consistent.")
-                elif issues or confidence <= 0.5: st.error(f"❌ Analysis completed with {len(issues)} issue(s).")
-                else: st.warning(f"⚠️ Analysis complete, confidence moderate or minor issues ({len(issues)} issue(s)).")
-                if issues: st.subheader("Detected Issues / Areas for Caution:"); [st.markdown(f"- {issue}") for issue in issues]; st.markdown("---")
-
-            # Display Skill Gap Summary section
-            st.subheader("Skill Gap Summary:")
-            if gaps and isinstance(gaps, dict) and not gaps.get('error'):
-                weak_skills = gaps.get('weak', []) # List of dicts with original case 'skill' key
-                missing_skills = gaps.get('missing', []) # List of original case skill names
-
-                # Display Weak Skills
-                if weak_skills:
-                    st.markdown("**Skills Below Baseline:**")
-                    for item in sorted(weak_skills, key=lambda x: x['skill']): st.markdown(f"- Improve **{item['skill']}** by **{item['gap']}** points (Your score: {item['user']}, Baseline: {item['baseline']}).")
-                else:
-                    if not missing_skills: st.success("✅ Great news! Your listed skills meet or exceed the baseline requirements!")
-                    else: st.markdown("**Skills Below Baseline:** None")
-                st.markdown("---")
-
-                # Display Missing Skills
-                if missing_skills:
-                    st.markdown("**Missing Baseline Skills:**"); st.markdown(f"Consider acquiring these skills relevant to a {career_goal or 'target role'}:")
-                    num_missing_cols = 3 if len(missing_skills) > 5 else 2 if len(missing_skills) > 2 else 1; cols = st.columns(num_missing_cols); col_index = 0
-                    for skill in sorted(missing_skills):
-                        with cols[col_index % num_missing_cols]: st.markdown(f"- **{skill}**"); col_index += 1
-                else:
-                    if not weak_skills: pass
-                    else: st.markdown("**Missing Baseline Skills:** None")
-            elif gaps and gaps.get('error'): st.warning(f"Could not display skill gap summary: {gaps['error']}")
-            else:
-                if not validation or not validation.get('is_valid', True): st.warning("Skill gap summary unavailable due to analysis issues.")
-                else: st.info("No skill gap data available.")
-
-            if not validation:
-                if results.get('error'): st.error(f"Validation could not be performed: {results['error']}")
-                else: st.warning("Validation feedback not available.")
+        else: render_agent_feedback(results)
     else: st.warning("Received invalid results format.")
 else: st.info("👈 Enter your career goal and skills in the sidebar to get started!")
 
 # --- Footer ---
 st.markdown("---")
-st.markdown("<div class='footer'>Built by AB with ❤️ using Streamlit, CrewAI, and OpenAI</div>", unsafe_allow_html=True)
\ No newline at end of file
+st.markdown("<div class='footer'>Built by AB with ❤️ using Streamlit, CrewAI, and OpenAI</div>", unsafe_allow_html=True)
+
+# --- Startup Report (printed once per process, after the first full script run) ---
+mark("first page painted")
+print_startup_report()
\ No newline at end of file
@@ -0,0 +1,162 @@
+# crew/agent_runner.py
+import asyncio
+import os
+from crew.resilience import call_with_resilience
+from utils.json_stream import JsonStreamExtractor
+from utils.rate_limiter import governor_from_env
+from utils.structured_output import build_repair_prompt, parse_structured_output
+
+# --- LLM Admission Control ---
+# Every agent call in the process goes through one governor, so concurrent runs (sessions, batch
+# jobs, parallel resource lookups) queue fairly instead of tripping the provider's 429 rate limits.
+llm_governor = governor_from_env()
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "600"))
+
+# --- Structured Output ---
+# Ask the model for a JSON object response (OpenAI JSON mode) on structured tasks; disable for models without it
+LLM_JSON_MODE = os.getenv("LLM_JSON_MODE", "true").lower() in ("1", "true", "yes")
+# Stream structured answers and close the stream as soon as the first JSON object is complete
+LLM_STREAM_JSON = os.getenv("LLM_STREAM_JSON", "true").lower() in ("1", "true", "yes")
+
+
+def format_agent_goal(agent, inputs=None):
+    """ Interpolates run inputs (e.g. {skill}) into prompt-template goals, like Crew.kickoff does. """
+    goal = getattr(agent, 'goal', '') or ''
+    if not inputs:
+        return goal
+    try:
+        return goal.format(**inputs)
+    except (KeyError, IndexError, ValueError):
+        return goal # Goal references placeholders we don't have; use it verbatim
+
+
+def build_agent_messages(agent, description, expected_output, context=None, inputs=None):
+    """ Builds the chat messages for a single agent turn (system persona + task), mirroring CrewAI's prompt layout. """
+    system_prompt = (
+        f"You are {agent.role}. {agent.backstory}\n"
+        f"Your personal goal is: {format_agent_goal(agent, inputs)}"
+    )
+    task_prompt = description
+    if context:
+        task_prompt += f"\n\nThis is the context you're working with:\n{context}"
+    task_prompt += (
+        f"\n\nThis is the expected criteria for your final answer: {expected_output}\n"
+        "You MUST return the actual complete content as the final answer, not a summary."
+    )
+    return [("system", system_prompt), ("human", task_prompt)]
+
+
+def estimate_prompt_tokens(messages):
+    """ Rough prompt token count (~4 characters per token). """
+    return sum(len(content) for _, content in messages) // 4
+
+
+def estimate_request_tokens(messages):
+    """ Rough prompt + completion token estimate (~4 characters per token) for reserving TPM budget. """
+    return estimate_prompt_tokens(messages) + EXPECTED_COMPLETION_TOKENS
+
+
+def response_token_usage(response):
+    """ Total tokens reported by a LangChain chat response, or None if the provider didn't report usage. """
+    usage = getattr(response, 'usage_metadata', None) or {}
+    if usage.get('total_tokens') is not None:
+        return usage['total_tokens']
+    token_usage = (getattr(response, 'response_metadata', None) or {}).get('token_usage') or {}
+    return token_usage.get('total_tokens')
+
+
+def execute_agent_task(agent, description, expected_output, context=None):
+    """ Blocking execution through CrewAI's own task runner. Used when the agent's LLM has no async API. """
+    from crewai import Task
+    if context:
+        description = f"{description}\n\nCONTEXT:\n{context}"
+    task = Task(description=description, expected_output=expected_output, agent=agent)
+    try:
+        return task.execute() # Try task.execute()
+    except AttributeError:
+        print(f"  >> Fallback: Using agent.execute_task() for '{agent.role}'.")
+        return agent.execute_task(task=task)
+
+
+async def aexecute_agent_task(agent, description, expected_output, context=None, inputs=None, json_mode=False):
+    """
+    Runs one agent task without blocking the event loop.
+
+    Agents are single-turn and tool-less, so when their LLM exposes `ainvoke` (LangChain chat models)
+    we call it directly. Otherwise the blocking CrewAI path runs in a worker thread.
+    Every attempt waits for admission from the process-wide `llm_governor`, then gets a timeout, transient-error
+    retries and optional hedging from crew.resilience; time spent queued for admission is not timed.
+    With json_mode, the model is asked for a JSON object response (when LLM_JSON_MODE allows it) and,
+    with LLM_STREAM_JSON, generation is cut off at the object's closing brace.
+
+    Returns:
+        str: The agent's final answer text.
+    """
+    messages = build_agent_messages(agent, description, expected_output, context=context, inputs=inputs)
+    estimated_tokens = estimate_request_tokens(messages)
+    attempt = lambda permit: _aexecute_once(agent, messages, description, expected_output, context, permit, json_mode)
+    admit = lambda wait: llm_governor.permit(estimated_tokens, wait=wait)
+    return await call_with_resilience(attempt, kind=getattr(agent, 'role', 'agent'), admit=admit)
+
+
+async def _aexecute_once(agent, messages, description, expected_output, context, permit, json_mode=False):
+    """ A single LLM request for aexecute_agent_task, made under an already granted governor permit. """
+    llm = getattr(agent, 'llm', None)
+    if json_mode and LLM_JSON_MODE and llm is not None and hasattr(llm, 'bind'):
+        llm = llm.bind(response_format={"type": "json_object"})
+    if json_mode and LLM_STREAM_JSON and llm is not None and hasattr(llm, 'astream'):
+        return await _astream_until_json(llm, messages, permit)
+    if llm is not None and hasattr(llm, 'ainvoke'):
+        response = await llm.ainvoke(messages)
+        permit.record_usage(response_token_usage(response))
+        return getattr(response, 'content', response)
+    return await asyncio.to_thread(execute_agent_task, agent, description, expected_output, context)
+
+
+async def _astream_until_json(llm, messages, permit):
+    """
+    Streams the answer token by token and stops once the first complete JSON object has arrived.
+    The permit is charged the usage the stream reports; the provider only sends it in the final chunk,
+    so when the stream is cut short the charge is estimated from the prompt and the characters consumed.
+    """
+    extractor = JsonStreamExtractor()
+    stream = llm.astream(messages, stream_usage=True)
+    total_tokens, consumed_chars = None, 0
+    try:
+        async for chunk in stream:
+            total_tokens = response_token_usage(chunk) or total_tokens
+            content = getattr(chunk, 'content', chunk)
+            consumed_chars += len(content) if isinstance(content, str) else 0
+            if extractor.feed(content) is not None:
+                break # Closing the stream drops the connection, so the trailing chatter is never generated
+    finally:
+        await stream.aclose()
+        if total_tokens is None:
+            total_tokens = estimate_prompt_tokens(messages) + consumed_chars // 4
+        permit.record_usage(total_tokens)
+    return extractor.text()
+
+
+async def aexecute_structured_task(agent, description, expected_output, schema, context=None, inputs=None):
+    """
+    Runs an agent task whose answer must be JSON matching `schema` (see utils.structured_output).
+    The answer is validated and coerced; if nothing usable comes back, the agent gets one repair
+    re-prompt quoting its previous answer and the problems found.
+
+    Returns:
+        tuple: (coerced value or None, raw output of the last attempt)
+    """
+    raw_output = await aexecute_agent_task(agent, description, expected_output, context=context, inputs=inputs, json_mode=True)
+    value, problems = parse_structured_output(raw_output, schema)
+    if value is not None:
+        if problems:
+            print(f"  >> Structured output from '{agent.role}' coerced: {problems[:5]}")
+        return value, raw_output
+
+    print(f"  >> Structured output from '{agent.role}' unusable ({problems}); sending one repair prompt.")
+    repair_description = build_repair_prompt(description, raw_output, problems, schema)
+    raw_output = await aexecute_agent_task(agent, repair_description, expected_output, context=context, inputs=inputs, json_mode=True)
+    value, problems = parse_structured_output(raw_output, schema)
+    if value is None:
+        print(f"  >> Repair attempt from '{agent.role}' still unusable: {problems}")
+    return value, raw_output
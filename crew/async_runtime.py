@@ -0,0 +1,42 @@
+# crew/async_runtime.py
+import asyncio
+import threading
+
+# --- Shared Background Event Loop ---
+# Every synchronous entry point submits its coroutine to one long-lived loop, so all advisor runs in the
+# process share a single thread for their LLM I/O instead of each blocking a thread of its own.
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def _run_loop_forever(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def get_advisor_loop():
+    """ Returns the process-wide advisor event loop, starting its daemon thread on first use. """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _loop_thread = threading.Thread(target=_run_loop_forever, args=(_loop,), name="advisor-event-loop", daemon=True)
+            _loop_thread.start()
+        return _loop
+
+
+def submit(coro):
+    """ Schedules a coroutine on the advisor loop and returns a concurrent.futures.Future for its result. """
+    return asyncio.run_coroutine_threadsafe(coro, get_advisor_loop())
+
+
+def run_sync(coro, timeout=None):
+    """
+    Runs a coroutine on the advisor loop and blocks the calling thread until it finishes.
+    Must not be called from the advisor loop itself (that would deadlock).
+    """
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() called from the advisor event loop; await the coroutine instead.")
+    return submit(coro).result(timeout=timeout)
@@ -1,317 +1,844 @@
 # crew/crew_setup.py # Version 5
 import os
 import json
-import re # Import regex for better parsing
+import asyncio
+import hashlib
+import queue
+import threading
+import time
+from collections import namedtuple
 from dotenv import load_dotenv
-from crewai import Agent, Task, Crew, Process
-# Import CrewOutput if it's a specific type, otherwise handle AttributeError
-# from crewai.outputs import CrewOutput # Example, adjust if needed
 
-# Import Agent definitions
-from agents.role_definition_agent import role_definition_agent
-from agents.baseline_threshold_agent import baseline_threshold_agent
-from agents.learning_resource_agent import learning_resource_agent
-from agents.job_match_generator_agent import job_match_generator_agent
+# Import Agent factories (agents and their LLM clients are built lazily on first use)
+from agents.role_definition_agent import get_role_definition_agent
+from agents.baseline_threshold_agent import get_baseline_threshold_agent
+from agents.role_baseline_agent import get_role_baseline_agent
+from agents.learning_resource_agent import get_learning_resource_agent, get_learning_resource_batch_agent
+from agents.job_match_generator_agent import get_job_match_generator_agent
 
 # Import the computational analyzer and boss validation logic
 from agents.skill_gap_analyzer import SkillGapAnalyzerAgent
 from agents.boss_agent import validate_outputs
 
+# Import the stage scheduler and async agent execution
+from crew.pipeline import PipelineStage, arun_pipeline
+from crew.agent_runner import aexecute_agent_task, aexecute_structured_task, llm_governor
+from crew.async_runtime import get_advisor_loop, run_sync, submit
+from crew.resilience import CallStats, current_call_stats
+from crew import events
+from crew.events import AdvisorEvent
+
 # Import Helper functions
-# We'll refine parse_json_output right here for clarity
-from utils.agent_helpers import format_user_skills_summary
+from utils.agent_helpers import format_user_skills_summary, is_fallback_or_template_output, generic_learning_resource_fallback, generic_job_posting_fallback
+from utils.agent_helpers import normalize_text, parse_json_output
+from utils.skill_taxonomy import taxonomy_key
+from utils.cache import cache_from_env
+from utils.role_canonicalizer import canonicalize_role
+from utils.single_flight import SingleFlight
+from utils.structured_output import BASELINE_SCHEMA, RESOURCE_MAP_SCHEMA, ROLE_BASELINE_SCHEMA
 
 load_dotenv()
 
-# --- Refined JSON Parser ---
-def parse_json_output_robust(llm_output):
-    """
-    Safely parses a JSON string potentially embedded in LLM output or CrewOutput object.
-    Handles potential markdown code blocks and extracts JSON from text.
-    """
-    raw_text = None
-    if isinstance(llm_output, str):
-        raw_text = llm_output
-    # Add checks for known CrewAI output objects if necessary
-    # Example (adjust based on actual object structure):
-    elif hasattr(llm_output, 'raw_output') and isinstance(llm_output.raw_output, str):
-         raw_text = llm_output.raw_output
-    elif hasattr(llm_output, 'result') and isinstance(llm_output.result, str):
-         raw_text = llm_output.result
-    elif hasattr(llm_output, '__str__'): # Fallback to string representation
-         raw_text = str(llm_output)
-    else:
-        print(f"Warning: Unexpected output type for JSON parsing: {type(llm_output)}")
-        return None
-
-    if not raw_text:
-        return None
-
-    # Use regex to find JSON block ```json ... ``` or just { ... }
-    # Regex to find JSON object starting with { and ending with }
-    # It handles nested braces. It's not perfect but often works for simple cases.
-    match = re.search(r'\{[\s\S]*\}', raw_text)
-
-    if match:
-        json_str = match.group(0)
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            print(f"Warning: Could not parse extracted JSON string: {e}\nString was: {json_str}")
-            return None # Indicate parsing failure
-    else:
-        # Fallback if no clear JSON object is found (maybe the whole string is JSON?)
-        try:
-             # Try parsing the whole cleaned text
-             cleaned_text = raw_text.strip()
-             if cleaned_text.startswith("```json"):
-                  cleaned_text = cleaned_text[7:-3].strip()
-             elif cleaned_text.startswith("```"):
-                  cleaned_text = cleaned_text[3:-3].strip()
-             return json.loads(cleaned_text)
-        except json.JSONDecodeError:
-             print(f"Warning: Could not parse raw LLM output as JSON. Output:\n{raw_text}")
-             return None
+# --- Learning Resource Lookup Settings ---
+MAX_SKILLS_FOR_RESOURCES = 5
+# Upper bound on simultaneous learning-resource lookups (one LLM call each) within a run
+RESOURCE_LOOKUP_CONCURRENCY = int(os.getenv("RESOURCE_LOOKUP_CONCURRENCY", "5"))
+# Batched mode: uncached skills are requested together (one LLM call per batch, keyed JSON answer);
+# skills the batch misses or answers with a template fall back to the single-skill lookup
+BATCH_RESOURCE_LOOKUPS = os.getenv("BATCH_RESOURCE_LOOKUPS", "true").lower() in ("1", "true", "yes")
+RESOURCE_BATCH_SIZE = int(os.getenv("RESOURCE_BATCH_SIZE", str(MAX_SKILLS_FOR_RESOURCES)))
+
+# --- Baseline Fast Path ---
+# One structured call (role_baseline_agent) returns the categorized skills and their baselines together,
+# instead of Role Definition -> Baseline Estimator in sequence. Falls back to the two-step path on failure.
+FAST_BASELINE = os.getenv("FAST_BASELINE", "false").lower() in ("1", "true", "yes")
+ROLE_SKILL_CATEGORIES = ("Core Technical Skills", "Secondary Technical Skills/Tools", "Soft Skills")
+
+# --- Time Budget Settings ---
+# Default end-to-end budget in seconds for a run (0 = unbounded); callers can override per run
+DEFAULT_TIME_BUDGET = float(os.getenv("ADVISOR_TIME_BUDGET", "0"))
+# Fraction of the budget, measured from run start, by which each LLM-backed stage must finish.
+# Baseline is two serial agent calls and gates gaps -> resources; job_posting runs alongside both.
+# The computational stages (skill_gaps, validation) are not bounded.
+STAGE_BUDGET_SHARES = {'baseline': 0.5, 'learning_resources': 0.9, 'job_posting': 0.9}
+
+# --- JSON Parsing ---
+# Free-text JSON parsing lives in utils.agent_helpers.parse_json_output; schema-checked agent answers
+# go through crew.agent_runner.aexecute_structured_task. Old name kept for existing imports.
+parse_json_output_robust = parse_json_output
 
 
 # --- Initialize Computational Agents/Validators ---
 skill_gap_analyzer = SkillGapAnalyzerAgent()
 
-# --- In-Memory Cache ---
-session_cache = {}
+# --- Advisor Cache (memory LRU + persistent SQLite tier) ---
+# Keys: role_def_{role_key}, baseline_{role_key}, resources_{taxonomy_key(skill)}, job_{role_key}_{summary digest}
+# role_key is the canonical form from utils.role_canonicalizer, so equivalent phrasings share entries;
+# taxonomy_key keeps '+', '#' and '.', so C, C++ and C# (or .NET and NET) never share resources.
+advisor_cache = cache_from_env()
+ROLE_MATCH_THRESHOLD = int(os.getenv("ROLE_MATCH_THRESHOLD", "90"))
+
+# --- Request Coalescing ---
+# Concurrent runs that miss the cache on the same key wait on one in-flight computation (keys = cache keys)
+advisor_flights = SingleFlight()
+
+
+def job_posting_cache_key(role_key, user_summary):
+    """ Job postings are tailored to the user's skill summary, so it is part of the key. """
+    return f"job_{role_key}_{hashlib.sha1(user_summary.encode('utf-8')).hexdigest()[:16]}"
+
+
+def resource_cache_key(skill):
+    return f"resources_{taxonomy_key(skill)}"
+
+
+def resolve_role_key(role):
+    """ Canonical cache key for a role, fuzzy-matched against roles that already have a cached baseline. """
+    known_role_keys = [key[len("baseline_"):] for key in advisor_cache.keys("baseline_")]
+    resolution = canonicalize_role(role, known_role_keys, threshold=ROLE_MATCH_THRESHOLD)
+    print(f"Role '{role}' resolved to cache key '{resolution.key}' (via {resolution.method}, score {resolution.score})")
+    return resolution.key
 
 # --- Define Tasks (Ensure baseline_threshold_agent has static goal) ---
+# Plain description/expected-output templates; the CrewAI Task is only built if an agent needs the blocking path.
+TaskTemplate = namedtuple('TaskTemplate', ['description', 'expected_output'])
+
 # Task 1: Define Skills for the Role
-task_define_role_skills = Task(
+task_define_role_skills = TaskTemplate(
     description="Analyze the tech role: **{role}**. Identify and list its core technical skills, secondary technical skills/tools, and key soft skills. Use the prompt instructions precisely. Output should be structured text.",
     expected_output="A clearly structured text output listing Core Technical Skills, Secondary Technical Skills/Tools, and Soft Skills for the role: {role}.",
-    agent=role_definition_agent,
 )
 
 # Task 2: Define Baseline Proficiency Levels
-task_define_baseline_thresholds = Task(
+task_define_baseline_thresholds = TaskTemplate(
     description="CONTEXT PROVIDED: The output from the previous 'Role Skill Definer' task.\nYOUR TASK: Based *only* on the skill definition text provided in the context, estimate the standard baseline proficiency level (0-100) for each skill relevant to the role: **{role}**. Follow the detailed instructions in your internal prompt (baseline_prompt.txt) to parse the context and generate the JSON output.",
     expected_output="A single JSON object mapping each relevant skill identified from the context to its estimated baseline proficiency level (e.g., {{\"Skill A\": 75, \"Skill B\": 80, ...}}). Output ONLY the JSON.",
-    agent=baseline_threshold_agent,
-    context=[task_define_role_skills]
+)
+
+# Task 1+2 (fast path): Define Skills and Baseline Proficiency Levels in one answer
+task_define_role_baseline = TaskTemplate(
+    description="Analyze the tech role: **{role}**. Identify its core technical skills, secondary technical skills/tools, and key soft skills, and estimate the standard baseline proficiency level (0-100) for each one. Use the prompt instructions precisely.",
+    expected_output="A single JSON object with the keys \"Core Technical Skills\", \"Secondary Technical Skills/Tools\" and \"Soft Skills\", each mapping skill names to baseline proficiency levels (e.g., {{\"Core Technical Skills\": {{\"Skill A\": 80}}, ...}}). Output ONLY the JSON.",
 )
 
 # Task 3: Generate Mock Job Postings (Template Task)
-task_template_generate_job_match = Task(
+task_template_generate_job_match = TaskTemplate(
     description="Generate a realistic mock job posting for the tech role: **{role}**. Incorporate sections like Job Title, Company, Location, Salary Range, Description, Responsibilities, and Qualifications. Use the prompt instructions precisely. If provided, consider the user's skill summary: {user_skills_summary}",
     expected_output="A well-formatted block of text representing a realistic job posting.",
-    agent=job_match_generator_agent
 )
 
 # Task 4: Find Learning Resources (Template Task)
-task_template_find_learning_resources = Task(
+task_template_find_learning_resources = TaskTemplate(
     description="Find high-quality, free, online learning resources (courses, tutorials, documentation) for the specific technical skill: **{skill}**. Categorize them by difficulty (Beginner, Intermediate, Advanced) and provide direct URLs. Use the prompt instructions.",
     expected_output="A structured text output listing free learning resources with URLs.",
-    agent=learning_resource_agent
 )
 
-
-# --- Crew Definition ---
-initial_crew = Crew(
-    agents=[role_definition_agent, baseline_threshold_agent],
-    tasks=[task_define_role_skills, task_define_baseline_thresholds],
-    process=Process.sequential,
-    verbose=True
+# Task 4b: Find Learning Resources for several skills at once (Template Task, run by the batch agent)
+task_template_find_learning_resources_batch = TaskTemplate(
+    description="Find high-quality, free, online learning resources (courses, tutorials, documentation) for EACH of these technical skills:\n{skills_list}\n\nUse the prompt instructions.",
+    expected_output="A single JSON object mapping each skill name, exactly as listed, to a list of free learning resources with direct URLs. Output ONLY the JSON.",
 )
 
-# --- Main Orchestration Function ---
-def run_tech_advisor_crew(role: str, user_skills: dict):
-    """ Orchestrates the CrewAI agents to generate career advice. """
-    print(f"\n--- Running Tech Advisor Crew for Role: {role} ---")
-    results = {'role_skills_definition': "Processing...", 'baseline_thresholds': {}, 'skill_gaps': None, 'learning_resources': {}, 'job_posting': None, 'validation': {}}
-    validation_issues = []
-    final_confidence = 1.0
 
-    cache_key_role_def = f"role_def_{role}" # We won't retrieve role_def directly, but keep key for potential future use
-    cache_key_baseline = f"baseline_{role}"
+# --- Learning Resource Lookup (one skill) ---
+async def fetch_learning_resource(skill):
+    """
+    Runs the learning-resource task for a single skill (cached, and coalesced with identical in-flight lookups).
+    Never touches shared run state; the caller applies the returned issue/penalty.
 
+    Returns:
+        tuple: (resource_output, issue (str or None), confidence_penalty (float))
+    """
+    cache_key_resources = resource_cache_key(skill)
+    cached_output = await advisor_cache.aget(cache_key_resources)
+    if cached_output is not None:
+        print(f"CACHE HIT: Using cached learning resources for '{skill}'")
+        return cached_output, None, 0.0
+    return await advisor_flights.do(cache_key_resources, lambda: compute_learning_resource(skill, cache_key_resources))
+
+
+async def compute_learning_resource(skill, cache_key_resources):
+    """ Cache-miss path of fetch_learning_resource; runs once per key across concurrent callers. """
+    cached_output = await advisor_cache.aget(cache_key_resources) # A flight that just finished may have filled it
+    if cached_output is not None:
+        return cached_output, None, 0.0
+
+    issue = None
+    penalty = 0.0
     try:
-        # --- Step 1 & 2: Get Role Skills and Baselines ---
-        baseline_output_json = None
-
-        if cache_key_baseline in session_cache:
-             print(f"CACHE HIT: Using cached baseline thresholds for '{role}'")
-             baseline_output_json = session_cache[cache_key_baseline]
-             # Can't reliably get role_def from cache if not stored separately
-             results['role_skills_definition'] = "Retrieved from cache (content not stored separately)."
-        else:
-            print(f"CACHE MISS: Running initial crew (Role Def -> Baseline) for '{role}'...")
-            crew_inputs = {'role': role}
-            crew_result_object = initial_crew.kickoff(inputs=crew_inputs) # Get the result object
-
-            if not crew_result_object:
-                 print(f"WARNING: Initial crew returned an empty or None result for '{role}'.")
-                 validation_issues.append(f"Initial crew (Role Def->Baseline) returned no output for role '{role}'.")
-                 final_confidence -= 0.5
-                 baseline_output_json = {} # Assume failure
-                 results['role_skills_definition'] = "Initial crew failed to produce output."
-            else:
-                # Try parsing baseline from the result object using the robust parser
-                print("Parsing baseline thresholds from crew output...")
-                baseline_output_json = parse_json_output_robust(crew_result_object) # Use robust parser
-
-                if not baseline_output_json:
-                    print(f"WARNING: Failed to parse baseline JSON from crew output for '{role}'.")
-                    validation_issues.append(f"Failed to parse baseline proficiency JSON for role '{role}'.")
-                    final_confidence -= 0.4
-                    baseline_output_json = {} # Use empty dict
-                    # Store raw output for debugging if possible
-                    raw_output_for_debug = str(crew_result_object) if crew_result_object else "N/A"
-                    results['role_skills_definition'] = f"Baseline parsing failed. Raw crew output: {raw_output_for_debug[:200]}..." # Store snippet
-                else:
-                    print(f"Caching baseline thresholds for role '{role}'")
-                    session_cache[cache_key_baseline] = baseline_output_json
-                    # We don't have the intermediate role def easily, set placeholder
-                    results['role_skills_definition'] = "Role definition processed (output used for baseline)."
-
-        # --- Assign results ---
-        results['baseline_thresholds'] = baseline_output_json
-
-        # --- Step 3: Analyze Skill Gaps ---
-        print("Analyzing skill gaps...")
-        skill_gaps = None # <<<< INITIALIZE skill_gaps before the if/else
-        if results.get('baseline_thresholds'): # Check if baseline dict is not empty
+        resource_output = await aexecute_agent_task(
+            get_learning_resource_agent(),
+            task_template_find_learning_resources.description.format(skill=skill.strip()),
+            task_template_find_learning_resources.expected_output,
+            inputs={'skill': skill.strip()}
+        )
+    except Exception as e:
+        print(f"  - Error finding resources for {skill}: {e}")
+        resource_output = f"Error retrieving resources: {e}"
+        issue = f"Failed to get learning resources for '{skill}'."
+        penalty = 0.05
+    # Robust fallback/template detection
+    if is_fallback_or_template_output(resource_output):
+        resource_output = generic_learning_resource_fallback(skill)
+    elif not issue:
+        advisor_cache.set(cache_key_resources, str(resource_output)) # Only cache real answers
+    return resource_output, issue, penalty
+
+
+# --- Learning Resource Lookup (several skills, one LLM call) ---
+def format_batch_resource_entry(entry):
+    """ Renders one skill's value from the batch JSON as the bullet list the single-skill path produces. """
+    if isinstance(entry, str):
+        return entry.strip()
+    if isinstance(entry, list):
+        return "\n".join(f"- {item}" if isinstance(item, str) else f"- {json.dumps(item)}" for item in entry)
+    if isinstance(entry, dict):
+        return "\n".join(f"- {name}: {url}" for name, url in entry.items())
+    return ""
+
+
+async def fetch_learning_resources_batch(skills):
+    """
+    Runs one batched learning-resource task for several uncached skills (coalesced with identical batches).
+
+    Returns:
+        dict: {skill: resource_output} for the skills the batch answered usably. Missing or template-looking
+              answers are left out so the caller can fall back to fetch_learning_resource for them.
+    """
+    digest = hashlib.sha1("|".join(sorted(taxonomy_key(skill) for skill in skills)).encode('utf-8')).hexdigest()[:16]
+    return await advisor_flights.do(f"resources_batch_{digest}", lambda: compute_learning_resources_batch(skills))
+
+
+async def compute_learning_resources_batch(skills):
+    """ Cache-miss path of fetch_learning_resources_batch; caches each real per-skill answer. """
+    try:
+        parsed, _ = await aexecute_structured_task(
+            get_learning_resource_batch_agent(),
+            task_template_find_learning_resources_batch.description.format(
+                skills_list="\n".join(f"- {skill.strip()}" for skill in skills)),
+            task_template_find_learning_resources_batch.expected_output,
+            RESOURCE_MAP_SCHEMA
+        )
+    except Exception as e:
+        print(f"  - Batched resource lookup failed for {skills}: {e}")
+        return {}
+
+    if parsed is None:
+        print(f"  - Batched resource lookup returned no usable JSON for {skills}; falling back per skill.")
+        return {}
+
+    entries = {taxonomy_key(name): entry for name, entry in parsed.items()}
+    answered = {}
+    for skill in skills:
+        resource_output = format_batch_resource_entry(entries.get(taxonomy_key(skill)))
+        if resource_output and not is_fallback_or_template_output(resource_output):
+            advisor_cache.set(resource_cache_key(skill), resource_output)
+            answered[skill] = resource_output
+    print(f"  - Batched resource lookup answered {len(answered)}/{len(skills)} skills.")
+    return answered
+
+
+# --- Run Issue Collector ---
+class RunReport:
+    """
+    Thread-safe collector for programmatic validation issues and confidence penalties raised by stages.
+    Also forwards partial-result events to an optional on_event(AdvisorEvent) listener.
+    """
+    def __init__(self, on_event=None):
+        self._lock = threading.Lock()
+        self._on_event = on_event
+        self.issues = []
+        self.confidence = 1.0
+        self.degraded = {} # stage name -> reason, for stages filled from cache/fallbacks after a missed deadline
+
+    def add_issue(self, issue, penalty=0.0):
+        with self._lock:
+            self.issues.append(issue)
+            self.confidence -= penalty
+
+    def mark_degraded(self, stage, reason):
+        with self._lock:
+            self.degraded[stage] = reason
+
+    def emit(self, kind, payload, key=None):
+        if self._on_event:
             try:
-                skill_gaps = skill_gap_analyzer.analyze_gaps(user_skills, results['baseline_thresholds'])
-                results['skill_gaps'] = skill_gaps # Store the result
-            except Exception as gap_e:
-                 print(f"ERROR during skill gap analysis: {gap_e}")
-                 results['skill_gaps'] = {'error': f'Error during gap analysis: {gap_e}'}
-                 validation_issues.append("Skill gap analysis failed internally.")
-                 final_confidence -= 0.1
-        else:
-            # Baseline was empty or missing
-            results['skill_gaps'] = {'error': 'Baseline thresholds not available for gap analysis.'}
-            print("Skipping skill gap analysis as baseline is missing or invalid.")
-            # Validation issue/confidence penalty already applied during baseline step
-
-
-        # --- Step 4: Find Learning Resources ---
-        print("Finding learning resources...")
-        learning_resources = {}
-        skills_to_learn = []
-        # Use results['skill_gaps'] which is guaranteed to exist now
-        current_gaps = results.get('skill_gaps')
-        if current_gaps and not current_gaps.get('error'):
-             skills_to_learn.extend(current_gaps.get('missing', []))
-             skills_to_learn.extend([item['skill'] for item in current_gaps.get('weak', [])])
-
-        # (Rest of Step 4 remains the same, using task.execute() with fallback)
-        if skills_to_learn:
-            from utils.agent_helpers import is_fallback_or_template_output, generic_learning_resource_fallback
-            unique_skills_to_learn = sorted(list(set(skills_to_learn)))
-            print(f"Skills needing resources: {unique_skills_to_learn}")
-            MAX_SKILLS_FOR_RESOURCES = 5
-            skills_to_fetch = unique_skills_to_learn[:MAX_SKILLS_FOR_RESOURCES]
-
-            for skill in skills_to_fetch:
-                try:
-                    temp_task_desc = task_template_find_learning_resources.description.format(skill=skill.strip())
-                    temp_task = Task(description=temp_task_desc, expected_output=task_template_find_learning_resources.expected_output, agent=learning_resource_agent)
-                    resource_output = temp_task.execute() # Try task.execute()
-                except AttributeError:
-                    try:
-                        print(f"  >> Fallback: Using agent.execute_task() for learning resource: {skill}")
-                        resource_output = learning_resource_agent.execute_task(task=temp_task)
-                    except Exception as fallback_e:
-                        print(f"  - Error during agent.execute_task() fallback for {skill}: {fallback_e}")
-                        resource_output = f"Error retrieving resources (fallback failed): {fallback_e}"
-                        validation_issues.append(f"Failed to get learning resources for '{skill}' (fallback).")
-                        final_confidence -= 0.05
-                except Exception as e:
-                    print(f"  - Error finding resources for {skill}: {e}")
-                    resource_output = f"Error retrieving resources: {e}"
-                    validation_issues.append(f"Failed to get learning resources for '{skill}'.")
-                    final_confidence -= 0.05
-                # Robust fallback/template detection
-                if is_fallback_or_template_output(resource_output):
-                    resource_output = generic_learning_resource_fallback(skill)
-                learning_resources[skill] = resource_output
-
-            if len(unique_skills_to_learn) > MAX_SKILLS_FOR_RESOURCES:
-                learning_resources["INFO"] = f"Resource search limited to top {MAX_SKILLS_FOR_RESOURCES} skills."
-        else:
-            print("No actionable skill gaps identified requiring learning resources.")
-        results['learning_resources'] = learning_resources
-
-        # --- Step 5: Generate Mock Job Posting ---
-        # (Remains the same, using task.execute() with fallback)
-        print("Generating mock job posting...")
-        try:
-            from utils.agent_helpers import is_fallback_or_template_output, generic_job_posting_fallback
-            user_summary = format_user_skills_summary(user_skills)
-            temp_task_desc = task_template_generate_job_match.description.format(role=role, user_skills_summary=user_summary)
-            temp_task = Task(description=temp_task_desc, expected_output=task_template_generate_job_match.expected_output, agent=job_match_generator_agent)
-            job_output = temp_task.execute() # Try task.execute()
-        except AttributeError:
+                self._on_event(AdvisorEvent(kind, payload, key))
+            except Exception as e:
+                print(f"Warning: Advisor event listener failed on '{kind}': {e}")
+
+
+# --- Pipeline Stages ---
+async def stage_baseline(role, role_key, report):
+    """ Step 1 & 2: Role skill definition -> baseline proficiency levels (cached per canonical role key). """
+    cache_key_baseline = f"baseline_{role_key}"
+    cached_output = await cached_baseline_output(role, role_key)
+    if cached_output is not None:
+        return cached_output
+
+    # Concurrent runs for the same role share one Role Def -> Baseline computation
+    stage_output, issues = await advisor_flights.do(cache_key_baseline, lambda: compute_baseline(role, role_key))
+    for issue, penalty in issues:
+        report.add_issue(issue, penalty)
+    return stage_output
+
+
+async def cached_baseline_output(role, role_key):
+    """ Baseline stage output from the cache, or None on a miss. """
+    cached_baseline = await advisor_cache.aget(f"baseline_{role_key}")
+    if cached_baseline is None:
+        return None
+    print(f"CACHE HIT: Using cached baseline thresholds for '{role}'")
+    cached_role_def = await advisor_cache.aget(f"role_def_{role_key}")
+    return {'role_skills_definition': cached_role_def or "Retrieved from cache (content not stored separately).",
+            'baseline_thresholds': cached_baseline}
+
+
+async def compute_baseline(role, role_key):
+    """
+    Cache-miss path of stage_baseline.
+
+    Returns:
+        tuple: (stage_output dict, [(issue, confidence_penalty), ...])
+    """
+    cached_output = await cached_baseline_output(role, role_key) # A flight that just finished may have filled it
+    if cached_output is not None:
+        return cached_output, []
+
+    if FAST_BASELINE:
+        fast_output = await compute_baseline_fast(role)
+        if fast_output is not None:
+            role_definition, baseline_output_json = fast_output
+            return cache_baseline(role, role_key, role_definition, baseline_output_json), []
+        print(f"WARNING: Fast baseline path failed for '{role}'; falling back to Role Def -> Baseline.")
+
+    print(f"CACHE MISS: Running initial agents (Role Def -> Baseline) for '{role}'...")
+    role_definition = await aexecute_agent_task(
+        get_role_definition_agent(),
+        task_define_role_skills.description.format(role=role),
+        task_define_role_skills.expected_output.format(role=role),
+        inputs={'role': role}
+    )
+    baseline_raw_output = None
+    baseline_output_json = None
+    if role_definition:
+        # The baseline estimator re-reads the role definition as its context.
+        # Its answer is schema-checked (0-100 ints), with one repair re-prompt if unusable.
+        baseline_output_json, baseline_raw_output = await aexecute_structured_task(
+            get_baseline_threshold_agent(),
+            task_define_baseline_thresholds.description.format(role=role),
+            task_define_baseline_thresholds.expected_output.format(role=role),
+            BASELINE_SCHEMA,
+            context=role_definition,
+            inputs={'role': role}
+        )
+
+    if not baseline_raw_output:
+        print(f"WARNING: Initial crew returned an empty or None result for '{role}'.")
+        return ({'role_skills_definition': role_definition or "Initial crew failed to produce output.", 'baseline_thresholds': {}},
+                [(f"Initial crew (Role Def->Baseline) returned no output for role '{role}'.", 0.5)])
+
+    if not baseline_output_json:
+        print(f"WARNING: Failed to parse baseline JSON from crew output for '{role}'.")
+        # Store raw output for debugging if possible
+        raw_output_for_debug = str(baseline_raw_output)
+        return ({'role_skills_definition': f"Baseline parsing failed. Raw crew output: {raw_output_for_debug[:200]}...", # Store snippet
+                 'baseline_thresholds': {}},
+                [(f"Failed to parse baseline proficiency JSON for role '{role}'.", 0.4)])
+
+    return cache_baseline(role, role_key, role_definition, baseline_output_json), []
+
+
+def cache_baseline(role, role_key, role_definition, baseline_output_json):
+    """ Caches a successful role definition + baseline and returns the baseline stage output. """
+    print(f"Caching role definition and baseline thresholds for role '{role}'")
+    advisor_cache.set(f"role_def_{role_key}", str(role_definition))
+    advisor_cache.set(f"baseline_{role_key}", baseline_output_json)
+    if _role_matrix is not None:
+        _role_matrix.add_role(role_key, baseline_output_json)
+    return {'role_skills_definition': role_definition, 'baseline_thresholds': baseline_output_json}
+
+
+async def compute_baseline_fast(role):
+    """
+    Fast path of compute_baseline: one agent call for both the skill definition and the baselines.
+
+    Returns:
+        tuple: (role_definition text, baseline_thresholds dict), or None if the call or parsing failed.
+    """
+    print(f"CACHE MISS: Running fast baseline agent (Role Def + Baseline) for '{role}'...")
+    try:
+        parsed, _ = await aexecute_structured_task(
+            get_role_baseline_agent(),
+            task_define_role_baseline.description.format(role=role),
+            task_define_role_baseline.expected_output.format(role=role),
+            ROLE_BASELINE_SCHEMA,
+            inputs={'role': role}
+        )
+    except Exception as e:
+        print(f"  - Fast baseline call failed for '{role}': {e}")
+        return None
+    return split_role_baseline(parsed, role)
+
+
+def split_role_baseline(parsed, role):
+    """
+    Splits the fast path's categorized JSON (already coerced to ROLE_BASELINE_SCHEMA) into the two outputs
+    the two-step path produces:
+    a role definition text in role_definition_prompt's layout, and a flat {skill: baseline} dict.
+    """
+    if not isinstance(parsed, dict):
+        return None
+    categories = {normalize_text(str(name)): skills for name, skills in parsed.items()}
+    lines = [f"**Role:** {role}"]
+    baseline = {}
+    for category in ROLE_SKILL_CATEGORIES:
+        skills = categories.get(normalize_text(category))
+        if not isinstance(skills, dict) or not skills:
+            continue
+        lines.append(f"\n**{category}:**")
+        for skill, level in skills.items():
             try:
-                print("  >> Fallback: Using agent.execute_task() for job match.")
-                job_output = job_match_generator_agent.execute_task(task=temp_task)
-            except Exception as fallback_e:
-                print(f"  - Error during agent.execute_task() fallback for job match: {fallback_e}")
-                job_output = f"Error generating job posting (fallback failed): {fallback_e}"
-                validation_issues.append("Failed to generate mock job posting (fallback).")
-                final_confidence -= 0.15
-        except Exception as e:
-            print(f"Error generating job posting: {e}")
-            job_output = f"Error generating job posting: {e}"
-            validation_issues.append("Failed to generate mock job posting.")
-            final_confidence -= 0.15
-        # Robust fallback/template detection
-        if is_fallback_or_template_output(job_output):
-            job_output = generic_job_posting_fallback(role)
-        results['job_posting'] = job_output
-
-
-        # --- Step 6: Boss Agent Validation ---
-        print("Performing final validation...")
-        # (Remains the same)
-        validation_input = { # Prepare dict for validation function
-            'role_skills': results.get('role_skills_definition'), # Might be placeholder text
-            'baseline': results.get('baseline_thresholds'),
-            'gaps': results.get('skill_gaps'),
-            'resources': results.get('learning_resources'),
-            'job_postings': [results.get('job_posting')] if results.get('job_posting') and not results.get('job_posting').startswith("Error") else []
-        }
-        # Ensure validate_outputs handles potential None values gracefully
-        is_valid, boss_issues, boss_confidence = validate_outputs(validation_input)
-
-        all_issues = sorted(list(set(validation_issues + boss_issues)))
-        final_confidence = min(final_confidence, boss_confidence)
-        final_confidence = max(0.0, final_confidence)
+                level = int(round(float(level)))
+            except (TypeError, ValueError):
+                continue
+            baseline[str(skill).strip()] = max(0, min(100, level))
+            lines.append(f"- {str(skill).strip()}")
+    if not baseline:
+        return None
+    return "\n".join(lines), baseline
+
+
+async def degraded_baseline(role, role_key, report):
+    """ Deadline fallback for the baseline stage: the cache if a concurrent run filled it, else an empty baseline. """
+    cached_output = await cached_baseline_output(role, role_key)
+    if cached_output is not None:
+        report.mark_degraded('baseline', f"Baseline for '{role}' timed out; used the cached baseline.")
+        return cached_output
+    reason = f"Baseline for '{role}' could not be produced within the time budget."
+    report.mark_degraded('baseline', reason)
+    report.add_issue(reason, 0.5)
+    return {'role_skills_definition': "Skill definition timed out.", 'baseline_thresholds': {}}
+
+
+async def stage_skill_gaps(user_skills, baseline, report):
+    """ Step 3: Computational gap analysis against the baseline. """
+    print("Analyzing skill gaps...")
+    if not baseline: # Check if baseline dict is not empty
+        # Validation issue/confidence penalty already applied during baseline step
+        print("Skipping skill gap analysis as baseline is missing or invalid.")
+        return {'skill_gaps': {'error': 'Baseline thresholds not available for gap analysis.'}, 'skill_mapping': {}}
+    try:
+        skill_gaps, skill_mapping = skill_gap_analyzer.analyze_gaps(user_skills, baseline, return_mapping=True)
+        # The mapping goes out with the gaps so the UI can draw the radar without re-matching skills
+        return {'skill_gaps': skill_gaps, 'skill_mapping': skill_mapping}
+    except Exception as gap_e:
+        print(f"ERROR during skill gap analysis: {gap_e}")
+        report.add_issue("Skill gap analysis failed internally.", 0.1)
+        return {'skill_gaps': {'error': f'Error during gap analysis: {gap_e}'}, 'skill_mapping': {}}
+
+
+def skills_needing_resources(skill_gaps):
+    """ Sorted unique missing/weak skills from a gap analysis (empty if the analysis failed). """
+    skills_to_learn = []
+    if skill_gaps and not skill_gaps.get('error'):
+        skills_to_learn.extend(skill_gaps.get('missing', []))
+        skills_to_learn.extend([item['skill'] for item in skill_gaps.get('weak', [])])
+    return sorted(list(set(skills_to_learn)))
+
+
+def assemble_learning_resources(unique_skills_to_learn, resources_by_skill):
+    """ Orders fetched resources by skill (deterministic output) and adds the truncation note. """
+    learning_resources = {skill: resources_by_skill[skill]
+                          for skill in unique_skills_to_learn[:MAX_SKILLS_FOR_RESOURCES] if skill in resources_by_skill}
+    if len(unique_skills_to_learn) > MAX_SKILLS_FOR_RESOURCES:
+        learning_resources["INFO"] = f"Resource search limited to top {MAX_SKILLS_FOR_RESOURCES} skills."
+    return learning_resources
+
+
+async def stage_learning_resources(skill_gaps, report, progress):
+    """
+    Step 4: Learning resources for missing/weak skills, fetched concurrently.
+    Each finished lookup is recorded in `progress` ({skill: resource}) so a deadline fallback can keep it;
+    skills already in `progress` when the stage starts are kept and not fetched again.
+    """
+    print("Finding learning resources...")
+    unique_skills_to_learn = skills_needing_resources(skill_gaps)
+    if not unique_skills_to_learn:
+        print("No actionable skill gaps identified requiring learning resources.")
+        return {'learning_resources': {}}
+
+    print(f"Skills needing resources: {unique_skills_to_learn}")
+    skills_to_fetch = unique_skills_to_learn[:MAX_SKILLS_FOR_RESOURCES]
+
+    # Per-skill lookups are independent, so fan them out with a bounded number in flight
+    limiter = asyncio.Semaphore(max(1, RESOURCE_LOOKUP_CONCURRENCY))
+
+    def record(skill, resource_output):
+        progress[skill] = resource_output
+        report.emit(events.LEARNING_RESOURCE, {'skill': skill, 'resource': resource_output}, key=skill)
+
+    async def fetch_limited(skill):
+        async with limiter:
+            resource_output, issue, penalty = await fetch_learning_resource(skill)
+        if issue:
+            report.add_issue(issue, penalty)
+        record(skill, resource_output)
+
+    async def fetch_batch(skills):
+        async with limiter:
+            answered = await fetch_learning_resources_batch(skills)
+        for skill, resource_output in answered.items():
+            record(skill, resource_output)
+
+    candidates = [skill for skill in skills_to_fetch if skill not in progress]
+    cached_flags = await asyncio.gather(*(advisor_cache.acontains(resource_cache_key(skill)) for skill in candidates))
+    uncached_skills = [skill for skill, cached in zip(candidates, cached_flags) if not cached]
+    if BATCH_RESOURCE_LOOKUPS and len(uncached_skills) > 1:
+        batch_size = max(2, RESOURCE_BATCH_SIZE)
+        batches = [uncached_skills[i:i + batch_size] for i in range(0, len(uncached_skills), batch_size)]
+        await asyncio.gather(*(fetch_batch(batch) for batch in batches))
+
+    # Cache hits, single uncached skills, and anything the batch missed go through the single-skill path
+    await asyncio.gather(*(fetch_limited(skill) for skill in skills_to_fetch if skill not in progress))
+    return {'learning_resources': assemble_learning_resources(unique_skills_to_learn, progress)}
+
+
+async def degraded_learning_resources(skill_gaps, report, progress):
+    """ Deadline fallback: keeps lookups that finished, fills the rest from cache or generic resources. """
+    unique_skills_to_learn = skills_needing_resources(skill_gaps)
+    unfinished = [skill for skill in unique_skills_to_learn[:MAX_SKILLS_FOR_RESOURCES] if skill not in progress]
+    for skill in unfinished:
+        cached_output = await advisor_cache.aget(resource_cache_key(skill))
+        progress[skill] = cached_output if cached_output is not None else generic_learning_resource_fallback(skill)
+    if unfinished:
+        reason = f"Learning resources timed out for {len(unfinished)} skill(s); showing cached or generic resources: {', '.join(unfinished)}."
+        report.mark_degraded('learning_resources', reason)
+        report.add_issue(reason, 0.05 * len(unfinished))
+    return {'learning_resources': assemble_learning_resources(unique_skills_to_learn, progress)}
+
+
+async def stage_job_posting(role, role_key, user_skills, report):
+    """ Step 5: Mock job posting. Needs only the role and user skill summary, so it overlaps the baseline agents. """
+    print("Generating mock job posting...")
+    user_summary = format_user_skills_summary(user_skills)
+    cache_key_job = job_posting_cache_key(role_key, user_summary)
+    cached_job = await advisor_cache.aget(cache_key_job)
+    if cached_job is not None:
+        print(f"CACHE HIT: Using cached job posting for '{role}'")
+        return {'job_posting': cached_job}
+
+    job_output, issues = await advisor_flights.do(cache_key_job, lambda: compute_job_posting(role, user_summary, cache_key_job))
+    for issue, penalty in issues:
+        report.add_issue(issue, penalty)
+    return {'job_posting': job_output}
+
+
+async def compute_job_posting(role, user_summary, cache_key_job):
+    """
+    Cache-miss path of stage_job_posting.
 
-        results['validation'] = {
-            'is_valid': is_valid and not validation_issues, # Consider programmatic issues too
-            'issues': all_issues,
-            'confidence_score': final_confidence
-        }
-        print(f"Final Validation: Valid={results['validation']['is_valid']}, Issues Found={len(results['validation']['issues'])}, Confidence={results['validation']['confidence_score']:.2f}")
+    Returns:
+        tuple: (job_output, [(issue, confidence_penalty), ...])
+    """
+    cached_job = await advisor_cache.aget(cache_key_job) # A flight that just finished may have filled it
+    if cached_job is not None:
+        return cached_job, []
+
+    issues = []
+    try:
+        job_output = await aexecute_agent_task(
+            get_job_match_generator_agent(),
+            task_template_generate_job_match.description.format(role=role, user_skills_summary=user_summary),
+            task_template_generate_job_match.expected_output,
+            inputs={'role': role, 'user_skills_summary': user_summary}
+        )
+    except Exception as e:
+        print(f"Error generating job posting: {e}")
+        job_output = f"Error generating job posting: {e}"
+        issues.append(("Failed to generate mock job posting.", 0.15))
+    # Robust fallback/template detection
+    if is_fallback_or_template_output(job_output):
+        job_output = generic_job_posting_fallback(role)
+    elif not issues:
+        advisor_cache.set(cache_key_job, str(job_output)) # Only cache real answers
+    return job_output, issues
+
+
+async def degraded_job_posting(role, role_key, user_skills, report):
+    """ Deadline fallback for the job posting stage: the cached posting if any, else the generic template. """
+    cached_job = await advisor_cache.aget(job_posting_cache_key(role_key, format_user_skills_summary(user_skills)))
+    if cached_job is not None:
+        report.mark_degraded('job_posting', "Job posting generation timed out; used the cached posting.")
+        return {'job_posting': cached_job}
+    reason = "Job posting generation timed out; showing a generic posting."
+    report.mark_degraded('job_posting', reason)
+    report.add_issue(reason, 0.15)
+    return {'job_posting': generic_job_posting_fallback(role)}
+
+
+async def stage_validation(stage_outputs, report):
+    """ Step 6: Boss Agent validation over every upstream stage output. """
+    print("Performing final validation...")
+    outputs = {}
+    for stage_output in stage_outputs.values():
+        outputs.update(stage_output)
+
+    job_posting = outputs.get('job_posting')
+    validation_input = { # Prepare dict for validation function
+        'role_skills': outputs.get('role_skills_definition'), # Might be placeholder text
+        'baseline': outputs.get('baseline_thresholds'),
+        'gaps': outputs.get('skill_gaps'),
+        'resources': outputs.get('learning_resources'),
+        'job_postings': [job_posting] if job_posting and not job_posting.startswith("Error") else []
+    }
+    # Ensure validate_outputs handles potential None values gracefully
+    is_valid, boss_issues, boss_confidence = validate_outputs(validation_input)
+
+    all_issues = sorted(list(set(report.issues + boss_issues)))
+    final_confidence = min(report.confidence, boss_confidence)
+    final_confidence = max(0.0, final_confidence)
+
+    validation = {
+        'is_valid': is_valid and not report.issues, # Consider programmatic issues too
+        'issues': all_issues,
+        'confidence_score': final_confidence
+    }
+    print(f"Final Validation: Valid={validation['is_valid']}, Issues Found={len(validation['issues'])}, Confidence={validation['confidence_score']:.2f}")
+    return {'validation': validation}
+
+
+def stage_deadlines(time_budget):
+    """ Absolute loop-time deadline per LLM-backed stage for a run starting now ({} when unbounded). """
+    if not time_budget or time_budget <= 0:
+        return {}
+    started = asyncio.get_running_loop().time()
+    return {stage: started + share * time_budget for stage, share in STAGE_BUDGET_SHARES.items()}
+
+
+def build_advisor_pipeline(role, role_key, user_skills, report, time_budget=None):
+    """
+    Declares the advisor pipeline as a DAG:
+
+        baseline -> skill_gaps -> learning_resources --+
+        job_posting -----------------------------------+--> validation
+
+    With a time_budget (seconds), LLM-backed stages that miss their share are cancelled and
+    replaced by cached/generic output, and recorded in report.degraded.
+    """
+    deadlines = stage_deadlines(time_budget)
+    resource_progress = {}
+    return [
+        PipelineStage('baseline', lambda inputs: stage_baseline(role, role_key, report),
+                      deadline=deadlines.get('baseline'),
+                      fallback=lambda inputs: degraded_baseline(role, role_key, report)),
+        PipelineStage('skill_gaps', lambda inputs: stage_skill_gaps(user_skills, inputs['baseline']['baseline_thresholds'], report),
+                      depends_on=['baseline']),
+        PipelineStage('learning_resources', lambda inputs: stage_learning_resources(inputs['skill_gaps']['skill_gaps'], report, resource_progress),
+                      depends_on=['skill_gaps'], deadline=deadlines.get('learning_resources'),
+                      fallback=lambda inputs: degraded_learning_resources(inputs['skill_gaps']['skill_gaps'], report, resource_progress)),
+        PipelineStage('job_posting', lambda inputs: stage_job_posting(role, role_key, user_skills, report),
+                      deadline=deadlines.get('job_posting'),
+                      fallback=lambda inputs: degraded_job_posting(role, role_key, user_skills, report)),
+        PipelineStage('validation', lambda inputs: stage_validation(inputs, report),
+                      depends_on=['baseline', 'skill_gaps', 'learning_resources', 'job_posting']),
+    ]
+
+
+# --- Main Orchestration Functions ---
+async def arun_tech_advisor_crew(role: str, user_skills: dict, on_event=None, time_budget=None):
+    """
+    Orchestrates the agents to generate career advice without blocking the event loop.
+    Independent stages run concurrently; many runs can share one loop.
+
+    Args:
+        on_event (callable): Optional on_event(AdvisorEvent), called as each partial result becomes ready.
+                             The last event is always crew.events.DONE carrying the full results dict.
+                             It runs on the advisor event loop's thread.
+        time_budget (float): Seconds for the whole run, spread across stages (None = ADVISOR_TIME_BUDGET, 0 = unbounded).
+                             Stages still running when their share runs out are cancelled and filled from cache or
+                             generic fallbacks; they are listed in results['degraded'].
+    """
+    if asyncio.get_running_loop() is not get_advisor_loop():
+        # Keep all LLM I/O on the advisor loop so every run shares one async HTTP connection pool
+        return await asyncio.wrap_future(submit(arun_tech_advisor_crew(role, user_skills, on_event=on_event, time_budget=time_budget)))
 
+    print(f"\n--- Running Tech Advisor Crew for Role: {role} ---")
+    results = {'role_skills_definition': "Processing...", 'baseline_thresholds': {}, 'skill_gaps': None, 'skill_mapping': {}, 'learning_resources': {}, 'job_posting': None, 'validation': {}}
+    report = RunReport(on_event=on_event)
+    results['degraded'] = report.degraded
+    results['role'] = role
+    results['user_skills'] = dict(user_skills) # The ratings these gaps were computed for (see what-if recompute)
+    if time_budget is None:
+        time_budget = DEFAULT_TIME_BUDGET
+    call_stats = CallStats()
+    current_call_stats.set(call_stats) # Scoped to this run's task and the stage tasks it spawns
+
+    def on_stage_done(name, output):
+        # Merge each stage's output as soon as it lands so partial results survive a failure
+        results.update(output)
+        report.emit(name, output) # Stage names double as event kinds
 
+    try:
+        role_key = await asyncio.to_thread(resolve_role_key, role) # Before any cache lookup; scans the disk tier
+        await arun_pipeline(build_advisor_pipeline(role, role_key, user_skills, report, time_budget), on_stage_done=on_stage_done)
     except Exception as e:
         print(f"ERROR: An exception occurred during crew execution: {e}")
         import traceback
         traceback.print_exc()
-        if 'results' not in locals(): results = {}
         results['error'] = f"An unexpected error occurred during orchestration: {e}"
         results['validation'] = {
              'is_valid': False,
-             'issues': validation_issues + [f"Orchestration Error: {e}"],
+             'issues': report.issues + [f"Orchestration Error: {e}"],
              'confidence_score': 0.0
          }
         for key in ['role_skills_definition', 'baseline_thresholds', 'skill_gaps', 'learning_resources', 'job_posting']:
              if key not in results: results[key] = None
+        results['call_stats'] = call_stats.as_dict()
+        report.emit(events.DONE, results)
         return results
 
     print("--- Tech Advisor Crew Run Finished ---")
+    results['call_stats'] = call_stats.as_dict() # LLM calls, retries, timeouts and hedges made by this run
+    report.emit(events.DONE, results)
     return results
 
 
+def run_tech_advisor_crew(role: str, user_skills: dict, time_budget=None):
+    """ Synchronous wrapper: runs arun_tech_advisor_crew on the shared advisor event loop. """
+    return run_sync(arun_tech_advisor_crew(role, user_skills, time_budget=time_budget))
+
+
+async def astream_tech_advisor_crew(role: str, user_skills: dict, time_budget=None):
+    """
+    Async iterator variant of arun_tech_advisor_crew: yields AdvisorEvents as each piece becomes ready
+    (baseline, job posting, skill gaps, each learning resource, validation), ending with a DONE event.
+    """
+    loop = asyncio.get_running_loop()
+    event_queue = asyncio.Queue()
+    # Events are emitted from the advisor loop's thread; hand them over thread-safely
+    on_event = lambda event: loop.call_soon_threadsafe(event_queue.put_nowait, event)
+    run_task = asyncio.create_task(arun_tech_advisor_crew(role, user_skills, on_event=on_event, time_budget=time_budget))
+    try:
+        while True:
+            event = await event_queue.get()
+            yield event
+            if event.kind == events.DONE:
+                break
+        await run_task
+    finally:
+        if not run_task.done():
+            run_task.cancel()
+
+
+def stream_tech_advisor_crew(role: str, user_skills: dict, time_budget=None):
+    """
+    Blocking generator variant for synchronous callers (e.g. Streamlit): the run executes on the shared
+    advisor event loop while this thread yields AdvisorEvents as they arrive, ending with a DONE event.
+    """
+    event_queue = queue.Queue()
+    future = submit(arun_tech_advisor_crew(role, user_skills, on_event=event_queue.put, time_budget=time_budget))
+    try:
+        while True:
+            try:
+                event = event_queue.get(timeout=0.5)
+            except queue.Empty:
+                if future.done():
+                    future.result() # Surface an unexpected crash instead of waiting forever
+                    return
+                continue
+            yield event
+            if event.kind == events.DONE:
+                return
+    finally:
+        if not future.done():
+            future.cancel() # Consumer stopped early (e.g. Streamlit rerun)
+
+
+# --- What-If Recompute (slider changes, without re-running the crew) ---
+def what_if_skill_gaps(results, user_skills):
+    """
+    Gap analysis of new ratings against a finished run's baseline. Local and takes milliseconds: the baseline
+    comes from the run (cached per role) and its SkillIndex is reused.
+    Returns (skill_gaps, skill_mapping), or None if the run has no baseline.
+    """
+    baseline = results.get('baseline_thresholds') if results else None
+    if not baseline or not isinstance(baseline, dict):
+        return None
+    return skill_gap_analyzer.analyze_gaps(user_skills, baseline, return_mapping=True)
+
+
+async def arecompute_tech_advisor_results(results, user_skills, on_event=None):
+    """
+    Updates a finished run for new proficiency ratings. Gaps are recomputed locally, resources already found
+    for skills that are still gaps are kept, and only skills that newly became gaps are fetched (usually from
+    cache). No baseline, job posting or validation calls are made.
+
+    Returns:
+        dict: A new results dict (the input is not modified), same shape as run_tech_advisor_crew.
+    """
+    if asyncio.get_running_loop() is not get_advisor_loop():
+        return await asyncio.wrap_future(submit(arecompute_tech_advisor_results(results, user_skills, on_event=on_event)))
+
+    updated = dict(results)
+    analysis = what_if_skill_gaps(results, user_skills)
+    if analysis is None:
+        print("What-if recompute skipped: the run has no baseline to compare against.")
+        return updated
+    skill_gaps, skill_mapping = analysis
+    report = RunReport(on_event=on_event)
+    updated.update(skill_gaps=skill_gaps, skill_mapping=skill_mapping, user_skills=dict(user_skills))
+    report.emit(events.SKILL_GAPS, {'skill_gaps': skill_gaps, 'skill_mapping': skill_mapping})
+
+    previous_resources = results.get('learning_resources') or {}
+    wanted = skills_needing_resources(skill_gaps)[:MAX_SKILLS_FOR_RESOURCES]
+    progress = {skill: previous_resources[skill] for skill in wanted if skill in previous_resources}
+    new_gaps = [skill for skill in wanted if skill not in progress]
+    print(f"What-if recompute: {len(skill_gaps.get('missing', []))} missing, {len(skill_gaps.get('weak', []))} weak; "
+          f"fetching resources for {len(new_gaps)} new gap(s): {new_gaps}")
+    call_stats = CallStats()
+    current_call_stats.set(call_stats)
+    updated.update(await stage_learning_resources(skill_gaps, report, progress))
+    report.emit(events.LEARNING_RESOURCES, {'learning_resources': updated['learning_resources']})
+
+    if report.issues: # Only issues from the new lookups; the run's validation otherwise stands
+        validation = dict(updated.get('validation') or {})
+        validation['issues'] = sorted(set(validation.get('issues', []) + report.issues))
+        validation['confidence_score'] = max(0.0, min(validation.get('confidence_score', 1.0), report.confidence))
+        validation['is_valid'] = False
+        updated['validation'] = validation
+    if call_stats.as_dict()['calls']:
+        updated['call_stats'] = call_stats.as_dict()
+    report.emit(events.DONE, updated)
+    return updated
+
+
+def recompute_tech_advisor_results(results, user_skills):
+    """ Synchronous wrapper: runs arecompute_tech_advisor_results on the shared advisor event loop. """
+    return run_sync(arecompute_tech_advisor_results(results, user_skills))
+
+
+# --- Role Recommendations (no LLM calls) ---
+_role_matrix = None
+_role_matrix_lock = threading.Lock()
+
+
+def get_role_matrix():
+    """ RoleBaselineMatrix over every cached role baseline; built on first use, then kept in sync by cache_baseline. """
+    global _role_matrix
+    with _role_matrix_lock:
+        if _role_matrix is None:
+            from utils.role_matrix import role_matrix_from_cache # Deferred: pulls in numpy
+            _role_matrix = role_matrix_from_cache(advisor_cache)
+            print(f"Role matrix built: {len(_role_matrix)} roles, {len(_role_matrix.skill_names)} skills")
+        return _role_matrix
+
+
+def recommend_roles(user_skills, top_k=5):
+    """ Known roles closest to the user's ratings (smallest share of unmet baseline), best first. """
+    return get_role_matrix().nearest_roles(user_skills, top_k=top_k)
+
+
 # --- Test Execution Block ---
 if __name__ == '__main__':
     # test_role = "UI/UX Designer"
@@ -320,10 +847,25 @@ if __name__ == '__main__':
     test_user_skills = {"Python": 60, "SQL": 75, "Communication": 85}
 
 
-    session_cache.pop(f"role_def_{test_role}", None)
-    session_cache.pop(f"baseline_{test_role}", None)
+    test_role_key = resolve_role_key(test_role)
+    advisor_cache.delete(f"role_def_{test_role_key}")
+    advisor_cache.delete(f"baseline_{test_role_key}")
 
     final_results = run_tech_advisor_crew(test_role, test_user_skills)
 
     print("\n\n--- FINAL CREW RESULTS ---")
-    print(json.dumps(final_results, indent=2))
\ No newline at end of file
+    print(json.dumps(final_results, indent=2))
+    print("\n--- CACHE STATS ---")
+    print(json.dumps(advisor_cache.stats(), indent=2))
+    print("\n--- LLM GOVERNOR STATS ---")
+    print(json.dumps(llm_governor.stats(), indent=2))
+
+    # What-if: lower one rating and drop another; only newly created gaps hit the resource agent
+    what_if_skills = {"Python": 20, "Communication": 85}
+    started = time.perf_counter()
+    what_if_results = recompute_tech_advisor_results(final_results, what_if_skills)
+    print(f"\n--- WHAT-IF RESULTS ({(time.perf_counter() - started) * 1000:.0f} ms) ---")
+    print(json.dumps({key: what_if_results[key] for key in ('skill_gaps', 'learning_resources')}, indent=2))
+
+    print("\n--- CLOSEST KNOWN ROLES ---")
+    print(json.dumps(recommend_roles(test_user_skills), indent=2))
\ No newline at end of file
@@ -0,0 +1,32 @@
+# crew/events.py
+from dataclasses import dataclass, field
+
+# --- Event Kinds (in the order a typical run produces them) ---
+BASELINE = 'baseline'                   # payload: {'role_skills_definition': str, 'baseline_thresholds': dict}
+JOB_POSTING = 'job_posting'             # payload: {'job_posting': str} - may arrive before BASELINE
+SKILL_GAPS = 'skill_gaps'               # payload: {'skill_gaps': dict, 'skill_mapping': {baseline_skill: user_skill or None}}
+LEARNING_RESOURCE = 'learning_resource' # key: skill, payload: {'skill': str, 'resource': str}
+LEARNING_RESOURCES = 'learning_resources' # payload: {'learning_resources': dict} - all skills, incl. INFO note
+VALIDATION = 'validation'               # payload: {'validation': dict}
+DONE = 'done'                           # payload: the complete results dict, same shape as run_tech_advisor_crew
+
+EVENT_KINDS = (BASELINE, JOB_POSTING, SKILL_GAPS, LEARNING_RESOURCE, LEARNING_RESOURCES, VALIDATION, DONE)
+
+
+@dataclass(frozen=True)
+class AdvisorEvent:
+    """ A partial result produced while an advisor run is in progress. """
+    kind: str
+    payload: dict = field(default_factory=dict)
+    key: str = None
+
+    def apply_to(self, results):
+        """ Merges this event into a partial results dict (same keys as the final results). """
+        if self.kind == LEARNING_RESOURCE:
+            results.setdefault('learning_resources', {})[self.payload['skill']] = self.payload['resource']
+        elif self.kind != DONE:
+            results.update(self.payload)
+        else:
+            results.clear()
+            results.update(self.payload)
+        return results
@@ -0,0 +1,151 @@
+# crew/jobs.py
+import asyncio
+import os
+import threading
+import time
+import uuid
+from crew.async_runtime import submit
+from crew.crew_setup import arun_tech_advisor_crew
+from crew import events
+
+# --- Job Settings ---
+# Jobs run on the shared advisor event loop; at most this many advisor runs execute at once, the rest queue
+MAX_CONCURRENT_JOBS = int(os.getenv("ADVISOR_MAX_CONCURRENT_JOBS", "8"))
+# Finished jobs stay pollable this long (seconds), and at most this many jobs are kept in total
+JOB_RETENTION_SECONDS = int(os.getenv("ADVISOR_JOB_RETENTION_SECONDS", "900"))
+MAX_RETAINED_JOBS = int(os.getenv("ADVISOR_MAX_RETAINED_JOBS", "500"))
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+
+class AdvisorJob:
+    """ One background advisor run: status, partial results merged from its events, and the final results. """
+    def __init__(self, job_id, role, user_skills):
+        self.id = job_id
+        self.role = role
+        self.user_skills = dict(user_skills)
+        self.status = QUEUED
+        self.results = {'learning_resources': {}}
+        self.progress = [] # Human-readable labels of the events received so far
+        self.error = None
+        self.future = None
+        self.created_at = self.updated_at = time.time()
+        self._lock = threading.Lock()
+
+    def mark_running(self):
+        with self._lock:
+            if self.status == QUEUED:
+                self.status = RUNNING
+                self.updated_at = time.time()
+
+    def on_event(self, event):
+        """ AdvisorEvent listener; runs on the advisor loop's thread. """
+        with self._lock:
+            event.apply_to(self.results)
+            if event.kind != events.DONE:
+                self.progress.append(event.kind.replace('_', ' ').title() + (f": {event.key}" if event.key else ""))
+            self.updated_at = time.time()
+
+    def on_finished(self, future):
+        with self._lock:
+            if future.cancelled():
+                self.status = CANCELLED
+            elif future.exception() is not None:
+                self.status = FAILED
+                self.error = str(future.exception())
+            else:
+                self.status = DONE
+                self.results = future.result()
+            self.updated_at = time.time()
+
+    def snapshot(self):
+        """ Consistent copy of the job's state for a polling UI (results are a shallow copy). """
+        with self._lock:
+            return {
+                'id': self.id,
+                'role': self.role,
+                'status': self.status,
+                'results': dict(self.results),
+                'progress': list(self.progress),
+                'error': self.error,
+                'elapsed': (self.updated_at if self.status in FINISHED_STATES else time.time()) - self.created_at,
+            }
+
+
+class AdvisorJobManager:
+    """
+    Process-wide registry of background advisor runs. submit() returns a job id immediately; callers poll
+    get(job_id) for status and partial results, and cancel() stops a run. Jobs live in the manager, not in a
+    Streamlit session, so they survive reruns; sessions only keep the id.
+    """
+    def __init__(self, max_concurrent=MAX_CONCURRENT_JOBS, retention_seconds=JOB_RETENTION_SECONDS, max_jobs=MAX_RETAINED_JOBS):
+        self.max_concurrent = max(1, max_concurrent)
+        self.retention_seconds = retention_seconds
+        self.max_jobs = max_jobs
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._slots = None # asyncio.Semaphore, created on the advisor loop
+
+    async def _run(self, job, time_budget):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent) # Only ever touched from the advisor loop
+        async with self._slots:
+            job.mark_running()
+            return await arun_tech_advisor_crew(job.role, job.user_skills, on_event=job.on_event, time_budget=time_budget)
+
+    def submit(self, role, user_skills, time_budget=None):
+        """ Starts an advisor run in the background and returns its job id. """
+        job = AdvisorJob(uuid.uuid4().hex, role, user_skills)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = submit(self._run(job, time_budget))
+        job.future.add_done_callback(job.on_finished)
+        print(f"Job {job.id[:8]} submitted for role '{role}'")
+        return job.id
+
+    def get(self, job_id):
+        """ Snapshot of a job (see AdvisorJob.snapshot), or None if the id is unknown or expired. """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.snapshot() if job else None
+
+    def cancel(self, job_id):
+        """ Cancels a queued or running job; returns True if it was still unfinished. """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.future is None or job.future.done():
+            return False
+        print(f"Job {job_id[:8]} cancelled")
+        return job.future.cancel()
+
+    def _prune(self):
+        """ Drops expired finished jobs, then the oldest finished ones beyond max_jobs (caller holds the lock). """
+        now = time.time()
+        finished = sorted((job for job in self._jobs.values() if job.status in FINISHED_STATES), key=lambda job: job.updated_at)
+        for job in finished:
+            if now - job.updated_at > self.retention_seconds or len(self._jobs) >= self.max_jobs:
+                del self._jobs[job.id]
+
+    def stats(self):
+        with self._lock:
+            counts = {state: 0 for state in (QUEUED, RUNNING, *FINISHED_STATES)}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return dict(counts, retained=len(self._jobs), max_concurrent=self.max_concurrent)
+
+
+advisor_jobs = AdvisorJobManager()
+
+
+# --- Test Block ---
+if __name__ == '__main__':
+    first = advisor_jobs.submit("Data Scientist", {"Python": 60, "SQL": 75})
+    second = advisor_jobs.submit("Frontend Developer", {"JavaScript": 70})
+    advisor_jobs.cancel(second)
+    while advisor_jobs.get(first)['status'] not in FINISHED_STATES:
+        snapshot = advisor_jobs.get(first)
+        print(f"{snapshot['status']:8} {snapshot['elapsed']:5.1f}s  {snapshot['progress'][-1:]}")
+        time.sleep(0.5)
+    print(advisor_jobs.get(first)['status'], advisor_jobs.get(second)['status'], advisor_jobs.stats())
@@ -0,0 +1,110 @@
+# crew/pipeline.py
+import asyncio
+import inspect
+
+
+class PipelineStage:
+    """
+    One node of the advisor pipeline DAG.
+
+    Args:
+        name (str): Unique stage name, also the key of its output.
+        func (callable): Coroutine function called as await func(inputs), inputs being {dependency_name: output}.
+        depends_on (iterable): Names of the stages whose outputs this stage needs.
+        deadline (float): Optional absolute event-loop time (loop.time()) by which the stage must finish.
+        fallback (callable): Optional fallback(inputs) returning (or, if a coroutine function, resolving to) a
+                             substitute output when the deadline passes.
+                             Without one, a missed deadline raises asyncio.TimeoutError like any stage error.
+    """
+    def __init__(self, name, func, depends_on=(), deadline=None, fallback=None):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+        self.deadline = deadline
+        self.fallback = fallback
+
+    def __repr__(self):
+        return f"PipelineStage({self.name!r}, depends_on={list(self.depends_on)})"
+
+
+def validate_pipeline(stages):
+    """ Checks for duplicate names, unknown dependencies and cycles. Raises ValueError. """
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError(f"Duplicate stage names in pipeline: {names}")
+    known = set(names)
+    for stage in stages:
+        unknown = [dep for dep in stage.depends_on if dep not in known]
+        if unknown:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {unknown}")
+
+    # Kahn's algorithm: if we can't drain every stage, there is a cycle
+    remaining = {stage.name: set(stage.depends_on) for stage in stages}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Pipeline has a dependency cycle among: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+async def run_stage(stage, inputs):
+    """ Runs one stage, cancelling it at its deadline and substituting its fallback output if it has one. """
+    if stage.deadline is None:
+        return await stage.func(inputs)
+    loop = asyncio.get_running_loop()
+    timeout = max(0.0, stage.deadline - loop.time())
+    try:
+        return await asyncio.wait_for(stage.func(inputs), timeout=timeout)
+    except asyncio.TimeoutError:
+        # Timeouts raised inside the stage (e.g. an LLM call's own timeout) are real failures, not a missed deadline
+        if stage.fallback is None or loop.time() < stage.deadline:
+            raise
+        print(f"Stage '{stage.name}' missed its deadline; using fallback output.")
+        output = stage.fallback(inputs)
+        return await output if inspect.isawaitable(output) else output
+
+
+async def arun_pipeline(stages, on_stage_done=None):
+    """
+    Executes a DAG of PipelineStages on the running event loop, starting each stage as soon as all of
+    its dependencies finish. Stage functions are coroutine functions; independent stages overlap.
+
+    If any stage raises, the other running stages are cancelled and the exception is re-raised.
+    A stage that misses its deadline is cancelled and replaced by its fallback output (see PipelineStage).
+
+    Args:
+        stages (list): PipelineStage objects whose func is `async def func(inputs)`.
+        on_stage_done (callable): Optional on_stage_done(name, output), called as each stage finishes.
+
+    Returns:
+        dict: {stage_name: output}
+    """
+    validate_pipeline(stages)
+    outputs = {}
+    pending = {stage.name: stage for stage in stages}
+    running = {}  # asyncio.Task -> stage name
+
+    try:
+        while pending or running:
+            # Launch every stage whose dependencies are all satisfied
+            for name, stage in list(pending.items()):
+                if all(dep in outputs for dep in stage.depends_on):
+                    inputs = {dep: outputs[dep] for dep in stage.depends_on}
+                    running[asyncio.create_task(run_stage(stage, inputs), name=f"stage-{name}")] = name
+                    del pending[name]
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                outputs[name] = task.result()  # Re-raises the stage's exception, if any
+                if on_stage_done:
+                    on_stage_done(name, outputs[name])
+    except BaseException:
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+    return outputs
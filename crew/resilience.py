@@ -0,0 +1,187 @@
+# crew/resilience.py
+import asyncio
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+# --- Resilience Settings ---
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "45")) # Seconds per attempt (hedges included); 0 disables
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10")) # Latency samples needed before hedging a call kind
+
+# Errors worth retrying, matched by class name so no provider SDK import is needed here
+TRANSIENT_ERROR_NAMES = {
+    'TimeoutError', 'APITimeoutError', 'APIConnectionError', 'RateLimitError', 'InternalServerError',
+    'ServiceUnavailableError', 'TimeoutException', 'ConnectError', 'ConnectTimeout', 'ReadTimeout',
+    'ReadError', 'WriteError', 'RemoteProtocolError', 'PoolTimeout',
+}
+TRANSIENT_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_transient_error(error):
+    """ True for timeouts, connection failures, rate limits and 5xx responses; False for everything else. """
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    status_code = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status_code in TRANSIENT_STATUS_CODES
+
+
+def backoff_delay(attempt):
+    """ Full-jitter exponential backoff: uniform(0, min(max_delay, base * 2**attempt)). """
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+# --- Latency Tracking (for hedging) ---
+class LatencyTracker:
+    """ Rolling window of successful call latencies per call kind (e.g. agent role). """
+    def __init__(self, window=200):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, kind, seconds):
+        with self._lock:
+            self._samples[kind].append(seconds)
+
+    def percentile(self, kind, pct):
+        """ The pct-th percentile latency for `kind`, or None until LLM_HEDGE_MIN_SAMPLES samples exist. """
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+call_latencies = LatencyTracker()
+
+
+# --- Per-run Call Statistics ---
+class CallStats:
+    """ Thread-safe retry/hedge/timeout counters for one advisor run. """
+    FIELDS = ('calls', 'retries', 'timeouts', 'hedges', 'hedge_wins', 'failures')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def bump(self, field):
+        with self._lock:
+            self._counts[field] += 1
+
+    def as_dict(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+# Set by the orchestrator at the start of a run; tasks spawned by the run inherit it
+current_call_stats = contextvars.ContextVar('current_call_stats', default=None)
+
+
+def _bump(field):
+    stats = current_call_stats.get()
+    if stats is not None:
+        stats.bump(field)
+
+
+class _NoHedgeCapacity(Exception):
+    """ A hedge could not be admitted without waiting; the primary request keeps running alone. """
+
+
+async def _timed_call(call, kind):
+    started = time.monotonic()
+    result = await call()
+    call_latencies.record(kind, time.monotonic() - started)
+    return result
+
+
+async def _hedge_call(call, kind, admit, hedge_after):
+    """ Duplicate request for _hedged_attempt; with admission control it must get a permit without queueing. """
+    if admit is None:
+        print(f"  >> Hedging slow '{kind}' call after {hedge_after:.2f}s (p95)")
+        _bump('hedges')
+        return await _timed_call(call, kind)
+    async with admit(wait=False) as permit:
+        if permit is None:
+            raise _NoHedgeCapacity()
+        print(f"  >> Hedging slow '{kind}' call after {hedge_after:.2f}s (p95)")
+        _bump('hedges')
+        return await _timed_call(lambda: call(permit), kind)
+
+
+async def _hedged_attempt(primary_call, call, kind, admit):
+    """ Runs primary_call(); if it outlives the observed p95 for `kind`, races a duplicate and keeps the first success. """
+    primary = asyncio.ensure_future(_timed_call(primary_call, kind))
+    hedge_after = call_latencies.percentile(kind, 95) if LLM_HEDGING else None
+    if hedge_after is None:
+        return await primary
+
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_after)
+        if done:
+            return primary.result()
+        hedge = asyncio.ensure_future(_hedge_call(call, kind, admit, hedge_after))
+        pending = {primary, hedge}
+        first_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _bump('hedge_wins')
+                    return task.result()
+                if not isinstance(task.exception(), _NoHedgeCapacity):
+                    first_error = first_error or task.exception()
+        raise first_error
+    finally:
+        for task in pending:
+            task.cancel() # The loser (or everything, if we were cancelled) stops consuming a connection
+
+
+async def _bounded_attempt(primary_call, call, kind, admit):
+    if LLM_CALL_TIMEOUT > 0:
+        return await asyncio.wait_for(_hedged_attempt(primary_call, call, kind, admit), timeout=LLM_CALL_TIMEOUT)
+    return await _hedged_attempt(primary_call, call, kind, admit)
+
+
+async def call_with_resilience(call, kind, admit=None):
+    """
+    Awaits call() with a per-attempt timeout, optional p95 hedging, and jittered exponential-backoff
+    retries on transient errors. Non-transient errors and exhausted retries are re-raised to the caller.
+
+    With admission control, each attempt first waits for a permit and only then starts its timeout and
+    latency clock, so queueing for the governor is never mistaken for a slow or timed-out provider call.
+    Hedges are only sent when a permit is free right away.
+
+    Args:
+        call (callable): Coroutine function performing one LLM request; call(permit) when `admit` is given.
+        kind (str): Latency bucket for hedging decisions (the agent role).
+        admit (callable): Optional admit(wait) returning an async context manager that yields a permit
+                          (e.g. LLMGovernor.permit); with wait=False it yields None instead of queueing.
+    """
+    _bump('calls')
+    attempt = 0
+    while True:
+        try:
+            if admit is None:
+                return await _bounded_attempt(call, call, kind, None)
+            async with admit(wait=True) as permit:
+                return await _bounded_attempt(lambda: call(permit), call, kind, admit)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                _bump('timeouts')
+            if attempt >= LLM_MAX_RETRIES or not is_transient_error(e):
+                _bump('failures')
+                raise
+            delay = backoff_delay(attempt)
+            attempt += 1
+            _bump('retries')
+            print(f"  >> Transient error from '{kind}' ({type(e).__name__}); retry {attempt}/{LLM_MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
@@ -2,30 +2,43 @@
 import json
 import difflib
 import re
-from fuzzywuzzy import fuzz
+from utils.json_stream import extract_first_json
 
-def parse_json_output(llm_output: str):
+def output_text(llm_output):
+    """ Raw text of an agent answer: a str, or a CrewAI output object (raw_output / result), else str(obj). """
+    if llm_output is None:
+        return None
+    if isinstance(llm_output, str):
+        return llm_output
+    if hasattr(llm_output, 'raw_output') and isinstance(llm_output.raw_output, str):
+        return llm_output.raw_output
+    if hasattr(llm_output, 'result') and isinstance(llm_output.result, str):
+        return llm_output.result
+    return str(llm_output)
+
+def parse_json_output(llm_output):
     """
-    Safely parses a JSON string potentially embedded in LLM output.
-    Handles potential markdown code blocks ```json ... ```
+    Safely parses a JSON value potentially embedded in LLM output or a CrewOutput object.
+    Handles markdown code blocks ```json ... ``` and JSON surrounded by prose.
+    Returns None if nothing parses.
     """
-    try:
-        # Check for markdown code block
-        if llm_output.strip().startswith("```json"):
-            # Extract content within the code block
-            json_str = llm_output.strip()[7:-3].strip() # Remove ```json and ```
-        elif llm_output.strip().startswith("```"):
-             json_str = llm_output.strip()[3:-3].strip() # Remove ``` and ```
-        else:
-            json_str = llm_output.strip()
+    raw_text = output_text(llm_output)
+    if not raw_text:
+        return None
 
-        return json.loads(json_str)
+    cleaned_text = raw_text.strip()
+    if cleaned_text.startswith("```"):
+        cleaned_text = re.sub(r'^```[a-zA-Z]*\s*|\s*```$', '', cleaned_text)
+    try:
+        return json.loads(cleaned_text)
     except json.JSONDecodeError:
-        print(f"Warning: Could not parse LLM output as JSON: {llm_output}")
-        return None # Indicate parsing failure
-    except Exception as e:
-        print(f"Error parsing JSON output: {e}\nOutput was: {llm_output}")
-        return None
+        pass
+
+    # JSON embedded in prose: the first balanced, valid {...} object (trailing chatter and stray braces are ignored)
+    parsed = extract_first_json(raw_text)
+    if parsed is None:
+        print(f"Warning: Could not parse LLM output as JSON. Output:\n{raw_text}")
+    return parsed
 
 def format_user_skills_summary(user_skills: dict) -> str:
     """ Formats user skills dictionary into a simple string summary. """
@@ -41,55 +54,12 @@ def normalize_text(text):
 
 def fuzzy_skill_match(user_skills, baseline_skills, threshold=80):
     """
-    Maps user-entered skills to closest baseline skills using synonym mapping and fuzzywuzzy matching (Levenshtein ratio).
+    Maps user-entered skills to closest baseline skills using synonym mapping and fuzzy matching (Levenshtein ratio).
+    Scoring runs on the baseline's precompiled SkillIndex (utils.skill_index), built once per baseline.
     Returns a dict: {baseline_skill: user_skill or None}
     """
-    from fuzzywuzzy import fuzz
-    skill_synonyms = {
-        'java': 'Programming Languages',
-        'c++': 'Programming Languages',
-        'python': 'Programming Languages',
-        'javascript': 'Programming Languages',
-        'data structures': 'Algorithms and Data Structures',
-        'algorithms': 'Algorithms and Data Structures',
-        'problem solving': 'Problem-Solving',
-        'oop': 'Object-Oriented Design',
-        'object oriented programming': 'Object-Oriented Design',
-        'object-oriented programming': 'Object-Oriented Design',
-        'version control': 'Version Control',
-        'git': 'Version Control',
-        'sql': 'Database Management',
-        'database': 'Database Management',
-        'testing': 'Testing',
-        'debugging': 'Debugging',
-        'web': 'Web Development',
-        'web dev': 'Web Development',
-        'software dev': 'Software Development',
-        'software development': 'Software Development',
-    }
-    mapping = {}
-    baseline_norm = {normalize_text(b): b for b in baseline_skills}
-    for user_skill in user_skills:
-        skill_key = normalize_text(user_skill)
-        # Try direct synonym mapping first
-        if skill_key in skill_synonyms:
-            target = normalize_text(skill_synonyms[skill_key])
-            if target in baseline_norm:
-                mapping[baseline_norm[target]] = user_skill
-                continue
-        # FuzzyWuzzy best match
-        best_score = 0
-        best_baseline = None
-        for base_norm, base_orig in baseline_norm.items():
-            score = fuzz.ratio(skill_key, base_norm)
-            if score > best_score:
-                best_score = score
-                best_baseline = base_orig
-        if best_score >= threshold:
-            mapping[best_baseline] = user_skill
-        else:
-            mapping[user_skill] = None
-    return mapping
+    from utils.skill_index import get_skill_index
+    return get_skill_index(baseline_skills).match(user_skills, threshold=threshold)
 
 def is_fallback_or_template_output(output):
     """Detects if agent output is fallback/template (not actionable). Add more patterns as needed."""
@@ -0,0 +1,314 @@
+# utils/cache.py
+import asyncio
+import atexit
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    Two-tier cache for LLM outputs (role definitions, baselines, learning resources, job postings).
+
+    - Memory tier: LRU with a per-entry TTL, an entry cap and a byte budget (sized by JSON length).
+    - Disk tier (optional): SQLite file that survives restarts; memory misses are promoted from it.
+      Writes are queued to one background writer thread (batched commits), and rows beyond
+      disk_max_entries are evicted oldest-written first, together with expired rows.
+
+    Coroutines on the advisor event loop use aget/acontains/akeys: memory hits return inline and disk
+    reads run in a worker thread, so SQLite never blocks the loop. set/delete never wait on the disk.
+
+    Values must be JSON-serializable. All methods are thread-safe.
+    """
+    DISK_PRUNE_EVERY = 64 # Writes between disk-tier evictions
+
+    def __init__(self, max_entries=512, max_bytes=16 * 1024 * 1024, ttl_seconds=6 * 3600,
+                 db_path=None, disk_ttl_seconds=30 * 24 * 3600, disk_max_entries=20000):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_ttl_seconds = disk_ttl_seconds
+        self.disk_max_entries = disk_max_entries
+        self.db_path = db_path
+
+        self._lock = threading.RLock() # Memory tier, counters and pending writes
+        self._memory = OrderedDict() # key -> (value, expires_at, size_bytes)
+        self._memory_bytes = 0
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'sets': 0,
+                          'evictions': 0, 'expirations': 0, 'disk_evictions': 0, 'disk_errors': 0}
+        self._db = None
+        self._db_lock = threading.Lock() # The SQLite connection is shared by readers and the writer thread
+        self._pending = {} # key -> latest queued write op, served to readers until it is committed
+        self._writes = queue.Queue()
+        self._writer = None
+        self._writes_since_prune = self.DISK_PRUNE_EVERY # Prune after the first batch
+        if db_path:
+            self._open_db(db_path)
+
+    # --- Disk Tier ---
+    def _open_db(self, db_path):
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False) # Guarded by self._db_lock
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, expires_at REAL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_created_at ON cache (created_at)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)")
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Warning: Persistent cache disabled, could not open '{db_path}': {e}")
+            self._db = None
+
+    def _count(self, field, amount=1):
+        with self._lock:
+            self._counters[field] += amount
+
+    def _disk_get(self, key, now):
+        """ Unexpired JSON text for `key` from pending writes or SQLite, else None. Never writes. """
+        with self._lock:
+            op = self._pending.get(key)
+        if op is not None:
+            return op[2] if op[0] == 'set' else None
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                                       (key, now)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            self._count('disk_errors')
+            print(f"Warning: Persistent cache read failed for '{key}': {e}")
+            return None
+
+    def _enqueue(self, op):
+        """ Queues a ('set', key, value_json, now) or ('delete', key) op for the writer thread. """
+        with self._lock:
+            self._pending[op[1]] = op
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, name="advisor-cache-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._writes.put(op)
+
+    def _writer_loop(self):
+        while True:
+            ops = [self._writes.get()]
+            while True: # Drain whatever else is queued into the same commit
+                try:
+                    ops.append(self._writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._disk_apply(ops)
+            finally:
+                with self._lock:
+                    for op in ops:
+                        if self._pending.get(op[1]) is op:
+                            del self._pending[op[1]]
+                for _ in ops:
+                    self._writes.task_done()
+
+    def _disk_apply(self, ops):
+        now = time.time()
+        try:
+            with self._db_lock:
+                for op in ops:
+                    if op[0] == 'set':
+                        _, key, value_json, created_at = op
+                        expires_at = created_at + self.disk_ttl_seconds if self.disk_ttl_seconds else None
+                        self._db.execute("INSERT OR REPLACE INTO cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                                         (key, value_json, created_at, expires_at))
+                    else:
+                        self._db.execute("DELETE FROM cache WHERE key = ?", (op[1],))
+                self._writes_since_prune += len(ops)
+                if self._writes_since_prune >= self.DISK_PRUNE_EVERY:
+                    self._writes_since_prune = 0
+                    self._disk_prune(now)
+                self._db.commit()
+        except sqlite3.Error as e:
+            self._count('disk_errors')
+            print(f"Warning: Persistent cache write failed for {len(ops)} op(s): {e}")
+
+    def _disk_prune(self, now):
+        """ Deletes expired rows, then the oldest-written rows beyond disk_max_entries (caller holds _db_lock). """
+        expired = self._db.execute("DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)).rowcount
+        evicted = 0
+        if self.disk_max_entries:
+            evicted = self._db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,)
+            ).rowcount
+        with self._lock:
+            self._counters['expirations'] += max(expired, 0)
+            self._counters['disk_evictions'] += max(evicted, 0)
+
+    def flush(self):
+        """ Blocks until every queued disk write is committed. """
+        if self._writer is not None:
+            self._writes.join()
+
+    # --- Memory Tier ---
+    def _memory_get(self, key, now):
+        """ Memory-tier value or _MISSING (caller holds the lock); drops the entry if it has expired. """
+        entry = self._memory.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at, size = entry
+        if expires_at is None or expires_at > now:
+            self._memory.move_to_end(key)
+            self._counters['memory_hits'] += 1
+            return value
+        del self._memory[key]
+        self._memory_bytes -= size
+        self._counters['expirations'] += 1
+        return _MISSING
+
+    def _memory_put(self, key, value, size, now):
+        if key in self._memory:
+            self._memory_bytes -= self._memory.pop(key)[2]
+        if size > self.max_bytes:
+            return # Would evict everything else; keep it on disk only
+        self._memory[key] = (value, now + self.ttl_seconds if self.ttl_seconds else None, size)
+        self._memory_bytes += size
+        while len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._counters['evictions'] += 1
+
+    def _load(self, key, default, now):
+        """ Memory-miss path: reads the disk tier and promotes the value into memory. """
+        value_json = self._disk_get(key, now) if self._db is not None else None
+        if value_json is None:
+            self._count('misses')
+            return default
+        value = json.loads(value_json)
+        with self._lock:
+            if key not in self._memory and key not in self._pending: # A newer set/delete wins over what we read
+                self._memory_put(key, value, len(value_json), now)
+            self._counters['disk_hits'] += 1
+        return value
+
+    # --- Public API ---
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            value = self._memory_get(key, now)
+        if value is not _MISSING:
+            return value
+        return self._load(key, default, now)
+
+    async def aget(self, key, default=None):
+        """ get() for coroutines: memory hits return inline, disk reads run in a worker thread. """
+        now = time.time()
+        with self._lock:
+            value = self._memory_get(key, now)
+        if value is not _MISSING:
+            return value
+        if self._db is None:
+            self._count('misses')
+            return default
+        return await asyncio.to_thread(self._load, key, default, now)
+
+    def set(self, key, value):
+        value_json = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, len(value_json), now)
+            self._counters['sets'] += 1
+        if self._db is not None:
+            self._enqueue(('set', key, value_json, now))
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._memory.pop(key, None)
+            if entry is not None:
+                self._memory_bytes -= entry[2]
+        if self._db is not None:
+            self._enqueue(('delete', key))
+
+    def _in_memory(self, key, now):
+        entry = self._memory.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > now)
+
+    def __contains__(self, key):
+        """ Plain membership check: no hit/miss counting, no LRU or promotion side effects. """
+        now = time.time()
+        with self._lock:
+            if self._in_memory(key, now):
+                return True
+        return self._db is not None and self._disk_get(key, now) is not None
+
+    async def acontains(self, key):
+        """ `key in cache` for coroutines; a disk lookup runs in a worker thread. """
+        with self._lock:
+            if self._in_memory(key, time.time()):
+                return True
+        return self._db is not None and await asyncio.to_thread(self.__contains__, key)
+
+    def keys(self, prefix=""):
+        """ Unexpired keys across both tiers that start with `prefix`. """
+        now = time.time()
+        with self._lock:
+            found = {key for key, (_, expires_at, _) in self._memory.items()
+                     if key.startswith(prefix) and (expires_at is None or expires_at > now)}
+            pending = dict(self._pending)
+        if self._db is not None:
+            try:
+                with self._db_lock:
+                    rows = self._db.execute(
+                        "SELECT key FROM cache WHERE key >= ? AND key < ? AND (expires_at IS NULL OR expires_at > ?)",
+                        (prefix, prefix + "\U0010ffff", now)
+                    ).fetchall()
+                found.update(row[0] for row in rows)
+            except sqlite3.Error as e:
+                self._count('disk_errors')
+                print(f"Warning: Persistent cache key scan failed: {e}")
+            for key, op in pending.items():
+                if key.startswith(prefix):
+                    (found.add if op[0] == 'set' else found.discard)(key)
+        return sorted(found)
+
+    async def akeys(self, prefix=""):
+        """ keys() for coroutines, run in a worker thread. """
+        return await asyncio.to_thread(self.keys, prefix)
+
+    def clear_memory(self):
+        """ Drops the memory tier only (e.g. to simulate a restart); the disk tier is untouched. """
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self):
+        """ Hit/miss/eviction counters plus current memory-tier occupancy and queued disk writes. """
+        with self._lock:
+            lookups = self._counters['memory_hits'] + self._counters['disk_hits'] + self._counters['misses']
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            return dict(self._counters,
+                        hit_rate=(hits / lookups) if lookups else 0.0,
+                        memory_entries=len(self._memory),
+                        memory_bytes=self._memory_bytes,
+                        pending_disk_writes=len(self._pending),
+                        persistent=self._db is not None)
+
+
+def cache_from_env():
+    """ Builds the advisor's TieredCache from ADVISOR_CACHE_* environment variables. """
+    return TieredCache(
+        max_entries=int(os.getenv("ADVISOR_CACHE_MAX_ENTRIES", "512")),
+        max_bytes=int(os.getenv("ADVISOR_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+        ttl_seconds=int(os.getenv("ADVISOR_CACHE_TTL_SECONDS", str(6 * 3600))),
+        db_path=os.getenv("ADVISOR_CACHE_PATH", ".cache/advisor_cache.sqlite3") or None, # Empty disables disk tier
+        disk_ttl_seconds=int(os.getenv("ADVISOR_CACHE_DISK_TTL_SECONDS", str(30 * 24 * 3600))),
+        disk_max_entries=int(os.getenv("ADVISOR_CACHE_DISK_MAX_ENTRIES", "20000")), # 0 = unbounded
+    )
@@ -1,5 +1,4 @@
 # utils/formatters.py
-import plotly.graph_objects as go
 import re
 
 # --- COLOR_SCALE remains the same ---
@@ -15,6 +14,7 @@ COLOR_SCALE = { "strong": "#34d399", # Emerald-400 (adjusted for dark mode)
 def create_radar_chart(user_skills_lower, baseline_skills_original, skill_gaps):
     """ Creates Plotly radar chart. Assumes lowercase user keys, original baseline keys. """
     if not baseline_skills_original: return None
+    import plotly.graph_objects as go # Deferred: plotly is only needed once there is a chart to draw
 
     labels = list(baseline_skills_original.keys())
     baseline_values = list(baseline_skills_original.values())
@@ -0,0 +1,199 @@
+# utils/rate_limiter.py
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket that hands out *reservations*: a caller takes what it needs
+    immediately (the balance may go negative) and is told how long to wait before proceeding.
+    Later callers queue behind earlier debt, so waits are FIFO-fair. A rate of 0 disables the bucket.
+    """
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate_per_second > 0
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def reserve(self, amount):
+        """ Takes `amount` tokens and returns the seconds to wait before they are actually available. """
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity) # A single oversized request must not wait forever
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate_per_second)
+
+    def adjust(self, delta):
+        """ Corrects a reservation once the real cost is known (positive delta = used more than reserved). """
+        if not self.enabled or not delta:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - delta)
+
+    def available(self):
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class GovernorPermit:
+    """ Handed to the caller inside LLMGovernor.permit(); report actual token usage when known. """
+    def __init__(self, governor, estimated_tokens):
+        self._governor = governor
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens = None
+        self.wait_seconds = 0.0
+
+    def record_usage(self, total_tokens):
+        if total_tokens is None or self.actual_tokens is not None:
+            return
+        self.actual_tokens = total_tokens
+        self._governor.tokens_per_minute.adjust(total_tokens - self.estimated_tokens)
+
+
+class LLMGovernor:
+    """
+    Process-wide admission control for LLM calls: a FIFO-queued cap on in-flight requests plus
+    requests-per-minute and tokens-per-minute buckets. Safe to use from any thread or event loop.
+    """
+    def __init__(self, max_in_flight=8, requests_per_minute=0, tokens_per_minute=0):
+        self.max_in_flight = max(1, max_in_flight)
+        self.requests_per_minute = TokenBucket(requests_per_minute)
+        self.tokens_per_minute = TokenBucket(tokens_per_minute)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiters = deque() # (loop, asyncio.Future) in arrival order
+        self._recent_waits = deque(maxlen=500)
+        self._counters = {'admitted': 0, 'queued': 0, 'total_wait_s': 0.0, 'max_wait_s': 0.0,
+                          'rate_limited': 0, 'tokens_estimated': 0, 'tokens_actual': 0}
+
+    # --- In-flight Slots ---
+    async def _acquire_slot(self):
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            entry = (loop, loop.create_future())
+            self._waiters.append(entry)
+            self._counters['queued'] += 1
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            with self._lock:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    raise
+            if not entry[1].cancelled():
+                self._release_slot() # The slot was granted just before we were cancelled
+            raise
+
+    def _try_acquire_slot(self, estimated_tokens):
+        """ Takes a slot only if one is free, nobody is queued and both buckets can cover the request now. """
+        requests, tokens = self.requests_per_minute.available(), self.tokens_per_minute.available()
+        if requests is not None and requests < 1:
+            return False
+        if tokens is not None and tokens < min(estimated_tokens, self.tokens_per_minute.capacity):
+            return False
+        with self._lock:
+            if self._in_flight < self.max_in_flight and not self._waiters:
+                self._in_flight += 1
+                return True
+        return False
+
+    def _release_slot(self):
+        with self._lock:
+            if self._waiters:
+                # Hand the slot straight to the next waiter; in-flight count is unchanged
+                loop, future = self._waiters.popleft()
+                loop.call_soon_threadsafe(self._grant, future)
+                return
+            self._in_flight -= 1
+
+    def _grant(self, future):
+        if future.cancelled():
+            self._release_slot() # Waiter gave up after the hand-off; pass the slot on
+        else:
+            future.set_result(None)
+
+    # --- Public API ---
+    @asynccontextmanager
+    async def permit(self, estimated_tokens=0, wait=True):
+        """
+        Waits for an in-flight slot and for request/token budget, then yields a GovernorPermit.
+        With wait=False, yields None instead of queueing when no slot or budget is free right now.
+        Usage:
+            async with governor.permit(estimated_tokens) as permit:
+                response = await llm.ainvoke(...)
+                permit.record_usage(total_tokens)
+        """
+        permit = GovernorPermit(self, estimated_tokens)
+        started = time.monotonic()
+        if wait:
+            await self._acquire_slot()
+        elif not self._try_acquire_slot(estimated_tokens):
+            yield None
+            return
+        try:
+            rate_wait = max(self.requests_per_minute.reserve(1), self.tokens_per_minute.reserve(estimated_tokens))
+            if rate_wait > 0:
+                await asyncio.sleep(rate_wait)
+            permit.wait_seconds = time.monotonic() - started
+            self._record_admission(permit, rate_limited=rate_wait > 0)
+            yield permit
+        finally:
+            self._release_slot()
+            if permit.actual_tokens is not None:
+                with self._lock:
+                    self._counters['tokens_actual'] += permit.actual_tokens
+
+    def _record_admission(self, permit, rate_limited):
+        with self._lock:
+            self._counters['admitted'] += 1
+            self._counters['total_wait_s'] += permit.wait_seconds
+            self._counters['max_wait_s'] = max(self._counters['max_wait_s'], permit.wait_seconds)
+            self._counters['tokens_estimated'] += permit.estimated_tokens
+            if rate_limited:
+                self._counters['rate_limited'] += 1
+            self._recent_waits.append(permit.wait_seconds)
+
+    def stats(self):
+        """ Queue depth, in-flight count, bucket levels and wait-time metrics (p50/p95 over recent admissions). """
+        with self._lock:
+            stats = dict(self._counters)
+            waits = sorted(self._recent_waits)
+            stats.update(in_flight=self._in_flight, queue_depth=len(self._waiters), max_in_flight=self.max_in_flight)
+        stats['avg_wait_s'] = stats['total_wait_s'] / stats['admitted'] if stats['admitted'] else 0.0
+        stats['p50_wait_s'] = waits[len(waits) // 2] if waits else 0.0
+        stats['p95_wait_s'] = waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0
+        stats['requests_available'] = self.requests_per_minute.available()
+        stats['tokens_available'] = self.tokens_per_minute.available()
+        return stats
+
+
+def governor_from_env():
+    """ Builds the process-wide LLMGovernor from LLM_MAX_IN_FLIGHT / LLM_REQUESTS_PER_MINUTE / LLM_TOKENS_PER_MINUTE. """
+    return LLMGovernor(
+        max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "8")),
+        requests_per_minute=int(os.getenv("LLM_REQUESTS_PER_MINUTE", "500")),
+        tokens_per_minute=int(os.getenv("LLM_TOKENS_PER_MINUTE", "200000")),
+    )
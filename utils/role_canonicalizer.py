@@ -0,0 +1,165 @@
+# utils/role_canonicalizer.py
+from collections import namedtuple
+from utils.skill_taxonomy import taxonomy_key
+
+# --- Role Alias Table ---
+# Keys are taxonomy_key() forms (lowercase, separators as spaces, '+', '#' and '.' kept); values are the canonical role key.
+# Add an entry whenever two phrasings should share one cached baseline: true synonyms, abbreviations and
+# spelling variants only. Related but different roles (Product Owner vs Product Manager) must stay apart,
+# since the canonical key is also the cache and single-flight key for baselines and job postings.
+ROLE_ALIASES = {
+    'ds': 'data scientist',
+    'data science': 'data scientist',
+    'da': 'data analyst',
+    'data analytics': 'data analyst',
+    'bi analyst': 'business intelligence analyst',
+    'de': 'data engineer',
+    'data engineering': 'data engineer',
+    'ml engineer': 'machine learning engineer',
+    'mle': 'machine learning engineer',
+    'machine learning': 'machine learning engineer',
+    'ai engineer': 'ai engineer',
+    'artificial intelligence engineer': 'ai engineer',
+    'swe': 'software engineer',
+    'sde': 'software engineer',
+    'software developer': 'software engineer',
+    'software development engineer': 'software engineer',
+    'programmer': 'software engineer',
+    'frontend dev': 'frontend developer',
+    'front end developer': 'frontend developer',
+    'frontend engineer': 'frontend developer',
+    'front end engineer': 'frontend developer',
+    'backend dev': 'backend developer',
+    'back end developer': 'backend developer',
+    'backend engineer': 'backend developer',
+    'back end engineer': 'backend developer',
+    'fullstack developer': 'full stack developer',
+    'full stack engineer': 'full stack developer',
+    'fullstack engineer': 'full stack developer',
+    'web developer': 'web developer',
+    'web dev': 'web developer',
+    'devops': 'devops engineer',
+    'dev ops engineer': 'devops engineer',
+    'site reliability engineer': 'site reliability engineer',
+    'sre': 'site reliability engineer',
+    'qa': 'qa engineer',
+    'quality assurance engineer': 'qa engineer',
+    'uiux designer': 'uiux designer',
+    'ui ux designer': 'uiux designer',
+    'ios dev': 'ios developer',
+    'android dev': 'android developer',
+    'mobile dev': 'mobile developer',
+    'security engineer': 'cybersecurity engineer',
+    'cyber security engineer': 'cybersecurity engineer',
+    'infosec engineer': 'cybersecurity engineer',
+    'security analyst': 'cybersecurity analyst',
+    'cyber security analyst': 'cybersecurity analyst',
+}
+
+# Seniority and level words don't change the skill set we estimate baselines for, but some of them are
+# also role nouns ("Tech Lead", "Staff Engineer"), so they are only stripped when a specific role remains
+SENIORITY_WORDS = {
+    'sr', 'senior', 'jr', 'junior', 'lead', 'principal', 'staff', 'mid', 'midlevel', 'entry',
+    'entrylevel', 'level', 'associate', 'intern', 'trainee', 'graduate', 'i', 'ii', 'iii', 'iv',
+}
+
+ROLE_NOUNS = {
+    'engineer', 'developer', 'scientist', 'analyst', 'designer', 'manager', 'architect', 'administrator',
+    'admin', 'tester', 'consultant', 'specialist', 'programmer', 'researcher', 'dev', 'owner', 'officer',
+}
+
+DEFAULT_FUZZY_THRESHOLD = 90
+
+RoleResolution = namedtuple('RoleResolution', ['key', 'method', 'score'])
+
+
+def _strip_seniority(tokens):
+    """
+    Drops seniority words only if what remains is still a specific role: a known alias ("Sr SWE" -> "swe")
+    or a role noun plus a specialty ("Senior Data Scientist" -> "data scientist"). "Tech Lead",
+    "Staff Engineer" and "Lead" are kept as typed.
+    """
+    stripped = [token for token in tokens if token not in SENIORITY_WORDS]
+    if stripped == tokens:
+        return tokens
+    if " ".join(stripped) in ROLE_ALIASES or (len(stripped) >= 2 and any(token in ROLE_NOUNS for token in stripped)):
+        return stripped
+    return tokens
+
+
+def _tokens_compatible(tokens_a, tokens_b):
+    """
+    Guards fuzzy matches against short-token swaps ("c developer" vs "r developer"):
+    every differing token pair must be a plausible typo of a word of 4+ characters.
+    """
+    from fuzzywuzzy import fuzz
+    if len(tokens_a) != len(tokens_b):
+        return False
+    for token_a, token_b in zip(tokens_a, tokens_b):
+        if token_a == token_b:
+            continue
+        if min(len(token_a), len(token_b)) < 4 or fuzz.ratio(token_a, token_b) < 80:
+            return False
+    return True
+
+
+def canonicalize_role(role, known_role_keys=(), threshold=DEFAULT_FUZZY_THRESHOLD):
+    """
+    Maps free-text role input to a canonical role key used for cache lookups.
+
+    Stages: taxonomy_key (keeps C, C++, C# and .NET distinct) -> strip seniority words -> alias table -> fuzzy nearest match against
+    roles we already know about (e.g. cached baselines) with a confidence threshold.
+
+    Args:
+        role (str): Role as typed by the user, e.g. "Sr. Data Scientist ".
+        known_role_keys (iterable): Canonical keys already in use (fuzzy match candidates).
+        threshold (int): Minimum fuzz.ratio (0-100) for a fuzzy match.
+
+    Returns:
+        RoleResolution: (key, method, score) where method is 'alias', 'known', 'fuzzy' or 'normalized'.
+    """
+    normalized = taxonomy_key(role or "")
+    tokens = _strip_seniority([token.rstrip('.') for token in normalized.split()]) # "sr." -> "sr"; ".net" kept
+    key = " ".join(tokens)
+
+    if key in ROLE_ALIASES:
+        return RoleResolution(ROLE_ALIASES[key], 'alias', 100)
+
+    known_role_keys = set(known_role_keys)
+    if key in known_role_keys:
+        return RoleResolution(key, 'known', 100)
+
+    if key and known_role_keys:
+        from fuzzywuzzy import fuzz
+        best_key, best_score = None, 0
+        for candidate in known_role_keys:
+            score = fuzz.ratio(key, candidate)
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_score >= threshold and _tokens_compatible(tokens, best_key.split()):
+            return RoleResolution(best_key, 'fuzzy', best_score)
+
+    return RoleResolution(key, 'normalized', 100)
+
+
+# --- Test Function (Optional) ---
+if __name__ == '__main__':
+    known = ['data scientist', 'frontend developer', 'c developer']
+    for test_role in ["Data Scientist", "data scientist ", "Sr. Data Scientist", "Data Scienist", "DS",
+                      "Front-End Developer", "R Developer", "Principal Software Developer"]:
+        print(f"{test_role!r:35} -> {canonicalize_role(test_role, known)}")
+
+    # Self-checks: symbols in language names and seniority words that are also role nouns
+    expected = {
+        "C Developer": 'c developer', "C++ Developer": 'c++ developer', "C# Developer": 'c# developer',
+        ".NET Developer": '.net developer', "Node.js Developer": 'node.js developer',
+        "Tech Lead": 'tech lead', "Team Lead": 'team lead', "Staff Engineer": 'staff engineer', "Lead": 'lead',
+        "Sr. Data Scientist": 'data scientist', "Lead Data Engineer": 'data engineer', "Senior SWE": 'software engineer',
+        "Principal Software Developer": 'software engineer', "Front-End Developer": 'frontend developer',
+        "Cloud Architect": 'cloud architect', "Product Owner": 'product owner', "Product Designer": 'product designer',
+        "UX Designer": 'ux designer', "UI Designer": 'ui designer', "UI/UX Designer": 'uiux designer',
+    }
+    for test_role, expected_key in expected.items():
+        resolved = canonicalize_role(test_role, known).key
+        assert resolved == expected_key, f"{test_role!r} resolved to {resolved!r}, expected {expected_key!r}"
+    print(f"All {len(expected)} canonicalization self-checks passed.")
\ No newline at end of file
@@ -0,0 +1,169 @@
+# utils/role_matrix.py
+import threading
+import numpy as np
+from utils.skill_taxonomy import get_skill_taxonomy, taxonomy_key
+
+
+class RoleBaselineMatrix:
+    """
+    Every known role baseline in one array-backed store, for role recommendations without LLM calls.
+
+    Skill names are interned to integer ids (taxonomy canonical name when the name is a known alias, so
+    'JS' and 'JavaScript' share an id). Role baselines are rows of a sparse (roles x skills) float32 matrix
+    kept CSR-style: one ids array, one levels array, and row offsets. A query scores every role at once:
+    per-entry gaps max(0, baseline - user level) are summed per row with np.bincount.
+    """
+    def __init__(self, taxonomy=None):
+        self.taxonomy = taxonomy if taxonomy is not None else get_skill_taxonomy()
+        self.skill_ids = {}   # interned key -> skill id
+        self.skill_names = [] # skill id -> first display name seen
+        self._rows = {}       # role key -> (skill ids, levels); compiled into CSR arrays on demand
+        self._lock = threading.Lock()
+        self._compiled = None
+        self._skill_index = None
+
+    def skill_key(self, name):
+        canonical = self.taxonomy.canonical(name)
+        return taxonomy_key(canonical or name) # Keeps '+', '#' and '.', so C, C++ and C# get separate ids
+
+    def _intern(self, name):
+        key = self.skill_key(name)
+        skill_id = self.skill_ids.get(key)
+        if skill_id is None:
+            skill_id = self.skill_ids[key] = len(self.skill_names)
+            self.skill_names.append(name)
+            self._skill_index = None # Vocabulary changed
+        return skill_id
+
+    def add_role(self, role_key, baseline):
+        """ Adds or replaces a role's baseline ({skill: level}); non-numeric levels are skipped. """
+        levels_by_id = {}
+        with self._lock:
+            for skill, level in (baseline or {}).items():
+                try:
+                    level = float(level)
+                except (ValueError, TypeError):
+                    continue
+                skill_id = self._intern(skill)
+                levels_by_id[skill_id] = max(level, levels_by_id.get(skill_id, 0.0))
+            if not levels_by_id:
+                return
+            self._rows[role_key] = (np.fromiter(levels_by_id.keys(), dtype=np.int64, count=len(levels_by_id)),
+                                    np.fromiter(levels_by_id.values(), dtype=np.float32, count=len(levels_by_id)))
+            self._compiled = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, role_key):
+        return role_key in self._rows
+
+    def _compile(self):
+        """ (role keys, skill ids, levels, entry -> row, per-row baseline totals), rebuilt after changes. """
+        with self._lock:
+            if self._compiled is None:
+                role_keys = list(self._rows)
+                rows = [self._rows[role_key] for role_key in role_keys]
+                sizes = np.array([len(ids) for ids, _ in rows], dtype=np.int64)
+                ids = np.concatenate([ids for ids, _ in rows]) if rows else np.zeros(0, dtype=np.int64)
+                levels = np.concatenate([levels for _, levels in rows]) if rows else np.zeros(0, dtype=np.float32)
+                entry_rows = np.repeat(np.arange(len(role_keys)), sizes)
+                totals = np.bincount(entry_rows, weights=levels, minlength=len(role_keys))
+                self._compiled = (role_keys, ids, levels, entry_rows, totals)
+            return self._compiled
+
+    def user_vector(self, user_skills):
+        """
+        Dense float32 vector of the user's levels over the interned skills. Names are mapped like gap analysis
+        (taxonomy, fuzzy, then semantic tier) against the whole skill vocabulary; unknown skills are ignored.
+        """
+        from utils.skill_index import SkillIndex
+        with self._lock:
+            if self._skill_index is None:
+                self._skill_index = SkillIndex(self.skill_names, taxonomy=self.taxonomy)
+            skill_index, vocabulary_size = self._skill_index, len(self.skill_names)
+        vector = np.zeros(vocabulary_size, dtype=np.float32)
+        names = list(user_skills)
+        for name, (target, _) in zip(names, skill_index.targets(names, threshold=80)):
+            if target is None:
+                continue
+            try:
+                level = float(user_skills[name])
+            except (ValueError, TypeError):
+                continue
+            skill_id = self.skill_ids[self.skill_key(target)]
+            vector[skill_id] = max(vector[skill_id], level)
+        return vector
+
+    def role_gaps(self, user_skills):
+        """ (role keys, total gap per role, baseline total per role), all roles scored in one vectorized pass. """
+        role_keys, ids, levels, entry_rows, totals = self._compile()
+        user = self.user_vector(user_skills)
+        user = np.pad(user, (0, max(0, len(self.skill_names) - len(user)))) # Skills interned since the vector was built
+        gaps = np.maximum(levels - user[ids], 0.0)
+        return role_keys, np.bincount(entry_rows, weights=gaps, minlength=len(role_keys)), totals
+
+    def nearest_roles(self, user_skills, top_k=5, by='fit'):
+        """
+        Roles closest to a user's ratings, best first, as [{'role', 'fit', 'total_gap'}].
+        by='fit' ranks by 1 - total_gap / baseline_total (share of the role's requirements already met);
+        by='total_gap' ranks by the absolute sum of missing proficiency points.
+        """
+        role_keys, total_gaps, totals = self.role_gaps(user_skills)
+        if not role_keys:
+            return []
+        fits = 1.0 - total_gaps / np.maximum(totals, 1e-9)
+        order_by = -fits if by == 'fit' else total_gaps
+        k = min(top_k, len(role_keys))
+        top = np.argpartition(order_by, k - 1)[:k]
+        top = top[np.lexsort((top, order_by[top]))]
+        return [{'role': role_keys[i], 'fit': round(float(fits[i]), 3), 'total_gap': round(float(total_gaps[i]), 1)} for i in top]
+
+
+def role_matrix_from_cache(cache, prefix="baseline_"):
+    """ RoleBaselineMatrix over every baseline cached under `prefix` (keys are baseline_{role_key}). """
+    matrix = RoleBaselineMatrix()
+    for key in cache.keys(prefix):
+        baseline = cache.get(key)
+        if isinstance(baseline, dict):
+            matrix.add_role(key[len(prefix):], baseline)
+    return matrix
+
+
+# --- Benchmark: nearest roles over a large catalog (dict loop vs. matrix) ---
+if __name__ == '__main__':
+    import random
+    import time
+
+    languages = RoleBaselineMatrix()
+    for role_key, skill in (("c developer", "C"), ("c++ developer", "C++"), ("c# developer", "C#")):
+        languages.add_role(role_key, {skill: 80})
+    assert len(languages.skill_names) == 3, languages.skill_names
+    assert languages.nearest_roles({"csharp": 80}, top_k=1) == [{'role': 'c# developer', 'fit': 1.0, 'total_gap': 0.0}]
+
+    random.seed(11)
+    vocabulary = [f"Skill {i}" for i in range(3000)] + ["Python", "SQL", "JavaScript", "Machine Learning", "Communication"]
+    catalog = {f"role {i}": {skill: random.randrange(30, 95, 5) for skill in random.sample(vocabulary, random.randint(15, 40))}
+               for i in range(5000)}
+    user = {skill: random.randrange(0, 101, 5) for skill in random.sample(vocabulary, 30)}
+
+    started = time.perf_counter()
+    matrix = RoleBaselineMatrix()
+    for role_key, baseline in catalog.items():
+        matrix.add_role(role_key, baseline)
+    matrix.nearest_roles(user) # Compiles the arrays and the vocabulary index
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    nearest = matrix.nearest_roles(user)
+    query_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter() # Exact-name dict loop, for comparison
+    user_levels = {taxonomy_key(skill): level for skill, level in user.items()}
+    looped = sorted(((1 - sum(max(0, level - user_levels.get(taxonomy_key(skill), 0)) for skill, level in baseline.items())
+                      / sum(baseline.values()), role_key) for role_key, baseline in catalog.items()), reverse=True)[:5]
+    loop_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{len(matrix)} roles, {len(matrix.skill_names)} skills: build {build_ms:.0f} ms, query {query_ms:.1f} ms, dict loop {loop_ms:.1f} ms")
+    print("matrix:", [(item['role'], item['fit']) for item in nearest])
+    print("loop:  ", [(role_key, round(fit, 3)) for fit, role_key in looped])
@@ -0,0 +1,147 @@
+# utils/semantic_matcher.py
+import os
+import re
+import zlib
+import numpy as np
+
+# --- Vectorizer Settings ---
+HASH_DIMENSIONS = 2048       # Hashed feature space (float32 matrix width)
+CHAR_NGRAM_RANGE = (2, 4)    # Character n-grams taken per word, with word-boundary padding
+WORD_WEIGHT = 2.0            # Whole-word features count more than any single n-gram
+ACRONYM_STOPWORDS = {'and', 'of', 'for', 'the', 'in', 'on', 'to', 'with'}
+
+# --- Matching Tier Settings ---
+SEMANTIC_SKILL_MATCHING = os.getenv("SEMANTIC_SKILL_MATCHING", "true").lower() == "true"
+SEMANTIC_MATCH_THRESHOLD = float(os.getenv("SEMANTIC_MATCH_THRESHOLD", "0.7")) # Cosine similarity, 0-1
+
+
+def semantic_words(text):
+    """ Lowercase words of a skill name; separators ('-', '/', '.', ...) split words rather than joining them. """
+    return re.sub(r'[^a-z0-9+#]+', ' ', str(text).lower()).split()
+
+
+def acronym(words):
+    """ 'natural language processing' -> 'nlp'; None for single words. """
+    words = [word for word in words if word not in ACRONYM_STOPWORDS]
+    return "".join(word[0] for word in words) if len(words) > 1 else None
+
+
+def numeronym(word):
+    """ 'kubernetes' -> 'k8s', 'internationalization' -> 'i18n'; None for short or non-alphabetic words. """
+    return f"{word[0]}{len(word) - 2}{word[-1]}" if len(word) >= 6 and word.isalpha() else None
+
+
+def _hash_feature(feature):
+    return zlib.crc32(feature.encode('utf-8')) % HASH_DIMENSIONS # Stable across processes, unlike hash()
+
+
+def _accumulate(vector, words):
+    """ Adds hashed char n-gram and whole-word counts of `words` to `vector`. """
+    for word in words:
+        padded = f" {word} "
+        for size in range(CHAR_NGRAM_RANGE[0], CHAR_NGRAM_RANGE[1] + 1):
+            for i in range(len(padded) - size + 1):
+                vector[_hash_feature(padded[i:i + size])] += 1.0
+        vector[_hash_feature(f"w:{word}")] += WORD_WEIGHT
+
+
+class SemanticSkillMatcher:
+    """
+    Offline similarity index for skill names, the tier after exact/alias/fuzzy matching.
+
+    Every skill is indexed under several surface forms ("views"): its name, its acronym ('ML' for
+    Machine Learning), its numeronym ('i18n'), and the aliases the taxonomy knows for it ('k8s' for a
+    Kubernetes skill). Views are hashed char n-gram + word vectors, TF-IDF weighted and L2-normalized in
+    one float32 matrix; queries are scored by a single batched matrix product and a skill scores the
+    cosine of its best view. No model download, network or GPU.
+    """
+    def __init__(self, names, taxonomy=None):
+        self.names = list(dict.fromkeys(names))
+        views, owners = [], []
+        for index, name in enumerate(self.names):
+            for view in self._views(name, taxonomy):
+                views.append(view)
+                owners.append(index)
+        counts = np.zeros((len(views), HASH_DIMENSIONS), dtype=np.float32)
+        for row, words in enumerate(views):
+            _accumulate(counts[row], words)
+        document_frequency = np.count_nonzero(counts, axis=0)
+        self.idf = (np.log((1 + len(views)) / (1 + document_frequency)) + 1).astype(np.float32)
+        self.matrix = self._normalize(counts * self.idf)
+        # Views of one skill are contiguous rows, so a skill's score is a reduceat-max over its slice
+        self.view_starts = np.searchsorted(np.asarray(owners, dtype=np.int64), np.arange(len(self.names)))
+
+    @staticmethod
+    def _views(name, taxonomy):
+        words = semantic_words(name)
+        views = [words] if words else [[name.lower()]]
+        short_forms = [acronym(words)]
+        if len(words) == 1:
+            short_forms.append(numeronym(words[0]))
+        if taxonomy is not None:
+            canonical, _ = taxonomy.resolve(name)
+            if canonical:
+                short_forms.extend(key for key, target in taxonomy.aliases.items() if target == canonical)
+        for form in short_forms:
+            form_words = semantic_words(form) if form else None
+            if form_words and form_words not in views:
+                views.append(form_words)
+        return views
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def __len__(self):
+        return len(self.names)
+
+    def vectorize(self, queries):
+        """ (queries x HASH_DIMENSIONS) TF-IDF query matrix, using the index's IDF weights. """
+        counts = np.zeros((len(queries), HASH_DIMENSIONS), dtype=np.float32)
+        for row, query in enumerate(queries):
+            _accumulate(counts[row], semantic_words(query))
+        return self._normalize(counts * self.idf)
+
+    def similarities(self, queries):
+        """ (queries x names) cosine similarity of each query to each skill's best view, in one batched product. """
+        if not self.names or not queries:
+            return np.zeros((len(queries), len(self.names)), dtype=np.float32)
+        view_scores = self.vectorize(queries) @ self.matrix.T
+        return np.maximum.reduceat(view_scores, self.view_starts, axis=1)
+
+    def search(self, queries, top_k=5):
+        """ For each query, up to top_k (name, cosine) pairs, best first. """
+        similarities = self.similarities(queries)
+        k = min(top_k, len(self.names))
+        results = []
+        for row in similarities:
+            if not k:
+                results.append([])
+                continue
+            top = np.argpartition(-row, k - 1)[:k]
+            top = top[np.lexsort((top, -row[top]))] # Best first; ties in index order
+            results.append([(self.names[i], float(row[i])) for i in top])
+        return results
+
+    def best_matches(self, queries, threshold=SEMANTIC_MATCH_THRESHOLD):
+        """ For each query, (name, cosine) of its best match if cosine >= threshold, else (None, cosine). """
+        matches = []
+        for hits in self.search(queries, top_k=1):
+            name, score = hits[0] if hits else (None, 0.0)
+            matches.append((name, score) if score >= threshold else (None, score))
+        return matches
+
+
+# --- Test Block ---
+if __name__ == '__main__':
+    from utils.skill_taxonomy import get_skill_taxonomy
+    baseline = ["Kubernetes Administration", "Machine Learning", "JavaScript", "Natural Language Processing",
+                "Continuous Integration", "Data Visualization", "Object-Oriented Design", "Internationalization",
+                "Data Structures and Algorithms", "SQL", "Go"]
+    matcher = SemanticSkillMatcher(baseline, taxonomy=get_skill_taxonomy())
+    queries = ["k8s", "ML", "Java", "NLP", "CI", "data viz", "OOD", "i18n", "DSA", "Postgres", "Cooking", "golang",
+               "Kubernetes admin", "machine-learning"]
+    for query, hits in zip(queries, matcher.search(queries, top_k=2)):
+        print(f"{query:18} -> " + ", ".join(f"{name} ({score:.2f})" for name, score in hits))
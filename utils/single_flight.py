@@ -0,0 +1,70 @@
+# utils/single_flight.py
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    In-process request coalescing: concurrent callers asking for the same key share one in-flight
+    computation instead of each running their own.
+
+    Works across threads and event loops (the shared state is a threading.Lock plus
+    concurrent.futures.Future), so Streamlit sessions and async API callers can share flights.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {} # key -> concurrent.futures.Future
+        self._counters = {'leaders': 0, 'followers': 0}
+
+    async def do(self, key, coro_fn):
+        """
+        Returns the result of `await coro_fn()`, running it only if no call for `key` is already in flight.
+        Followers receive the leader's result or exception. If the leader is cancelled, one follower
+        takes over instead of inheriting the cancellation.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = Future()
+                    self._flights[key] = flight
+                    self._counters['leaders'] += 1
+                else:
+                    self._counters['followers'] += 1
+
+            if leader:
+                return await self._lead(key, flight, coro_fn)
+            try:
+                # shield: a cancelled follower must not cancel the shared flight
+                return await asyncio.shield(asyncio.wrap_future(flight))
+            except asyncio.CancelledError:
+                if flight.cancelled():
+                    continue # Leader was cancelled; retry (possibly becoming the new leader)
+                raise
+
+    async def _lead(self, key, flight, coro_fn):
+        try:
+            result = await coro_fn()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    def in_flight(self):
+        with self._lock:
+            return sorted(self._flights)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters, in_flight=len(self._flights))
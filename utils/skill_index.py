@@ -0,0 +1,310 @@
+# utils/skill_index.py
+from functools import lru_cache
+import numpy as np
+from utils.skill_taxonomy import get_skill_taxonomy, taxonomy_key
+from utils.semantic_matcher import SemanticSkillMatcher, SEMANTIC_SKILL_MATCHING
+
+# Bit-parallel LCS works on one machine word, so queries up to this length are fully vectorized
+_WORD_BITS = 64
+
+# --- Candidate Pruning ---
+# Indexes at least this large narrow each query to its top-K skills by shared character trigrams
+# before exact scoring (K grows with sqrt(size) to hold recall); smaller ones are scored exhaustively.
+PRUNE_MIN_SKILLS = 512
+PRUNE_TOP_K = 64
+_POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(values):
+    """ Per-element popcount of a uint64 array. """
+    if hasattr(np, 'bitwise_count'): # NumPy >= 2.0
+        return np.bitwise_count(values).astype(np.int64)
+    return _POPCOUNT_8[values.view(np.uint8)].reshape(-1, 8).sum(axis=1).astype(np.int64)
+
+
+def char_trigrams(norm):
+    """ Padded character trigrams of a normalized name ('git' -> '  g', ' gi', 'git', 'it '). """
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _lcs_length(a, b):
+    """ Plain DP longest-common-subsequence length; only used for queries longer than one machine word. """
+    previous = [0] * (len(b) + 1)
+    for char_a in a:
+        current = [0]
+        for j, char_b in enumerate(b):
+            current.append(previous[j] + 1 if char_a == char_b else max(previous[j + 1], current[j]))
+        previous = current
+    return previous[-1]
+
+
+class SkillIndex:
+    """
+    Precompiled fuzzy-matching index over one baseline's skill names.
+
+    Scores a query against every skill in one vectorized pass using the bit-parallel LCS algorithm
+    (Hyyrö 2004) across a padded character matrix, giving exactly fuzzywuzzy's fuzz.ratio with
+    python-Levenshtein (round(100 * 2*LCS / (len_a + len_b))) without the per-pair Python loop.
+    Names are keyed and scored in taxonomy_key form, so C, C++ and C# stay distinct skills.
+    Build it once per baseline via get_skill_index(); match() keeps fuzzy_skill_match's semantics.
+    """
+    def __init__(self, baseline_skills, taxonomy=None):
+        self.norm_to_skill = {taxonomy_key(skill): skill for skill in baseline_skills}
+        self.norms = list(self.norm_to_skill)
+        self.taxonomy = taxonomy if taxonomy is not None else get_skill_taxonomy() # Shared, read-only
+
+        # Candidates as a (skills x max_len) matrix of character codes, 0-padded (code 0 never matches)
+        self.lengths = np.array([len(norm) for norm in self.norms], dtype=np.int64)
+        width = int(self.lengths.max()) if len(self.norms) else 0
+        self.codes = np.zeros((len(self.norms), width), dtype=np.uint8)
+        for row, norm in enumerate(self.norms):
+            self.codes[row, :len(norm)] = np.frombuffer(norm.encode('ascii', 'ignore'), dtype=np.uint8)
+        self._build_trigram_index()
+        self._semantic = None
+
+    @property
+    def semantic(self):
+        """ SemanticSkillMatcher over the same baseline, built on first use (most sessions never need it). """
+        if self._semantic is None:
+            self._semantic = SemanticSkillMatcher(self.norm_to_skill.values(), taxonomy=self.taxonomy)
+        return self._semantic
+
+    def _build_trigram_index(self):
+        """ Inverted index trigram -> skill rows, stored CSR-style (one postings array plus slice bounds). """
+        postings = {}
+        self.trigram_counts = np.zeros(len(self.norms), dtype=np.int64)
+        for row, norm in enumerate(self.norms):
+            grams = char_trigrams(norm)
+            self.trigram_counts[row] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.trigram_slices = {}
+        flat = []
+        for gram, rows in postings.items():
+            self.trigram_slices[gram] = (len(flat), len(flat) + len(rows))
+            flat.extend(rows)
+        self.postings = np.array(flat, dtype=np.int64)
+
+    def candidates(self, query_norm, top_k=None):
+        """
+        Rows of the top_k (default: max(PRUNE_TOP_K, sqrt(size))) skills most similar to the query by trigram Dice coefficient (ascending row order),
+        found through the inverted index without touching skills that share no trigram with it.
+        """
+        if top_k is None:
+            top_k = max(PRUNE_TOP_K, int(len(self) ** 0.5))
+        grams = char_trigrams(query_norm)
+        hits = [self.postings[start:end] for start, end in (self.trigram_slices.get(gram, (0, 0)) for gram in grams)]
+        hits = [rows for rows in hits if len(rows)]
+        if not hits:
+            return np.zeros(0, dtype=np.int64)
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.norms))
+        rows = np.flatnonzero(shared)
+        if len(rows) > top_k:
+            dice = 2 * shared[rows] / (len(grams) + self.trigram_counts[rows])
+            rows = np.sort(rows[np.argpartition(-dice, top_k - 1)[:top_k]])
+        return rows
+
+    def __len__(self):
+        return len(self.norms)
+
+    def lcs_lengths(self, query_norm, rows=None):
+        """ LCS length between `query_norm` and every indexed skill (or just `rows`), as an int64 array. """
+        codes = self.codes if rows is None else self.codes[rows]
+        if len(query_norm) > _WORD_BITS:
+            norms = self.norms if rows is None else [self.norms[row] for row in rows]
+            return np.array([_lcs_length(query_norm, norm) for norm in norms], dtype=np.int64)
+        match_masks = np.zeros(256, dtype=np.uint64)
+        for position, char in enumerate(query_norm.encode('ascii', 'ignore')):
+            match_masks[char] |= np.uint64(1 << position)
+        match_masks[0] = 0
+
+        state = np.full(len(codes), np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over='ignore'): # The algorithm relies on wrap-around uint64 arithmetic
+            for column in codes.T:
+                matched = state & match_masks[column]
+                state = (state + matched) | (state - matched)
+        query_mask = np.uint64((1 << len(query_norm)) - 1) if query_norm else np.uint64(0)
+        return len(query_norm) - _popcount(state & query_mask)
+
+    def scores(self, query_norm, rows=None):
+        """
+        fuzz.ratio-equivalent integer scores (0-100) of a normalized query against every indexed skill,
+        or only against `rows` (in the given order).
+        """
+        lengths = self.lengths if rows is None else self.lengths[rows]
+        if not len(lengths):
+            return np.zeros(0, dtype=np.int64)
+        total_lengths = lengths + len(query_norm)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratios = np.where(total_lengths > 0, 2 * self.lcs_lengths(query_norm, rows) / total_lengths, 0.0)
+        scores = np.rint(100 * ratios).astype(np.int64) # round-half-even, like fuzzywuzzy's int(round(...))
+        if not query_norm:
+            scores[:] = 0
+        scores[lengths == 0] = 0 # fuzzywuzzy scores anything against an empty string as 0
+        return scores
+
+    def score_matrix(self, queries):
+        """ (queries x skills) score matrix for raw query strings. """
+        return np.vstack([self.scores(taxonomy_key(query)) for query in queries]) if queries else np.zeros((0, len(self)), dtype=np.int64)
+
+    def best_match(self, query, prune=None):
+        """
+        (baseline_skill, score) for the best-scoring skill, or (None, 0). First skill wins ties.
+        With prune (default: index has >= PRUNE_MIN_SKILLS skills), only the trigram candidates are scored.
+        """
+        query_norm = taxonomy_key(query)
+        if prune is None:
+            prune = len(self) >= PRUNE_MIN_SKILLS
+        rows = self.candidates(query_norm) if prune else np.arange(len(self))
+        scores = self.scores(query_norm, rows)
+        if not len(scores) or scores.max() <= 0:
+            return None, 0
+        best = int(np.argmax(scores)) # rows are ascending, so this is still the first skill among ties
+        return self.norm_to_skill[self.norms[rows[best]]], int(scores[best])
+
+    def taxonomy_target(self, user_skill):
+        """
+        Baseline skill reached through the taxonomy: the user skill's canonical name, else its parent category.
+        Returns (baseline_skill or None, canonical name or None).
+        """
+        lineage = self.taxonomy.lineage(user_skill)
+        for name in lineage[:2]:
+            baseline_skill = self.norm_to_skill.get(taxonomy_key(name))
+            if baseline_skill is not None:
+                return baseline_skill, lineage[0]
+        return None, (lineage[0] if lineage else None)
+
+    def targets(self, user_skills, threshold=80, prune=None, semantic=None):
+        """
+        Baseline skill for each user skill on its own, as [(baseline_skill or None, tier)] in input order, where
+        tier is 'taxonomy' (exact alias or phrase -> canonical skill or its parent category, no fuzzy scoring),
+        'fuzzy' (best score >= threshold over the user's text or its canonical name), 'semantic' (cosine
+        similarity >= SEMANTIC_MATCH_THRESHOLD, one batched pass for whatever the cheaper tiers missed) or None.
+        For pruned large indexes, the fuzzy step assumes the best skill is among the trigram candidates.
+        """
+        semantic = SEMANTIC_SKILL_MATCHING if semantic is None else semantic
+        results = []
+        unmatched = []
+        for position, user_skill in enumerate(user_skills):
+            target, canonical = self.taxonomy_target(user_skill)
+            if target is not None:
+                results.append((target, 'taxonomy'))
+                continue
+            best_baseline, best_score = self.best_match(user_skill, prune=prune)
+            if canonical and taxonomy_key(canonical) != taxonomy_key(user_skill):
+                canonical_baseline, canonical_score = self.best_match(canonical, prune=prune)
+                if canonical_score > best_score:
+                    best_baseline, best_score = canonical_baseline, canonical_score
+            if best_score >= threshold:
+                results.append((best_baseline, 'fuzzy'))
+            else:
+                results.append((None, None))
+                unmatched.append(position)
+        if semantic and unmatched and self.norms:
+            matches = self.semantic.best_matches([user_skills[position] for position in unmatched])
+            for position, (target, _) in zip(unmatched, matches):
+                if target is not None:
+                    results[position] = (target, 'semantic')
+        return results
+
+    def match(self, user_skills, threshold=80, prune=None, semantic=None):
+        """
+        Maps user-entered skills to baseline skills via targets(); a semantic hit only claims a baseline skill
+        no taxonomy/fuzzy hit already covers ('ML' -> Machine Learning).
+        Returns a dict: {baseline_skill: user_skill or None}.
+        """
+        user_skills = list(user_skills)
+        mapping = {}
+        unmatched = []
+        for user_skill, (target, tier) in zip(user_skills, self.targets(user_skills, threshold, prune, semantic)):
+            if tier in ('taxonomy', 'fuzzy'):
+                mapping[target] = user_skill
+            else:
+                unmatched.append((user_skill, target))
+        for user_skill, target in unmatched:
+            if target is not None and mapping.get(target) is None:
+                mapping[target] = user_skill
+            else:
+                mapping[user_skill] = None
+        return mapping
+
+
+@lru_cache(maxsize=256)
+def _cached_skill_index(baseline_skills):
+    return SkillIndex(baseline_skills)
+
+
+def get_skill_index(baseline_skills):
+    """ The SkillIndex for a baseline's skill names, built once and reused while that baseline is in use. """
+    return _cached_skill_index(tuple(baseline_skills))
+
+
+# --- Benchmark: match latency vs. taxonomy size (brute force vs. vectorized vs. trigram-pruned) ---
+if __name__ == '__main__':
+    import random
+    import string
+    import time
+
+    # Self-check: C, C++ and C# in one baseline are three distinct skills
+    index = SkillIndex(["C", "C++", "C#", "SQL"])
+    expected = {"c": "C", "C++": "C++", "cpp": "C++", "c#": "C#", "csharp": "C#", "sql": "SQL"}
+    for query, (target, tier) in zip(expected, index.targets(list(expected))):
+        assert target == expected[query], f"{query!r} matched {target!r} via {tier}, expected {expected[query]!r}"
+    assert SkillIndex(["C++", "SQL"]).targets(["c", "c#"]) == [(None, None), (None, None)]
+    print("C / C++ / C# self-check passed.\n")
+
+    random.seed(7)
+    words = ["data", "cloud", "web", "machine", "learning", "design", "systems", "python", "react", "analysis",
+             "security", "network", "testing", "devops", "mobile", "ui", "ux", "sql", "api", "platform",
+             "kubernetes", "terraform", "spark", "kafka", "graphql", "rust", "embedded", "finance", "ml", "ops"]
+
+    def random_skill():
+        name = " ".join(random.sample(words, random.randint(1, 3))).title()
+        return name + random.choice(["", "", " " + "".join(random.choices(string.ascii_uppercase + string.digits, k=random.randint(1, 4)))])
+
+    def perturb(name):
+        chars = list(name.lower())
+        for _ in range(random.randint(0, 2)): # Typos: drop or duplicate a character
+            position = random.randrange(len(chars))
+            chars.insert(position, chars[position]) if random.random() < 0.5 else chars.pop(position)
+        return "".join(chars) or name
+
+    try:
+        from fuzzywuzzy import fuzz
+    except ImportError:
+        fuzz = None
+
+    print(f"{'skills':>7} {'build ms':>9} {'loop ms/q':>10} {'full ms/q':>10} {'pruned ms/q':>12} {'avg cands':>10} {'recall@80':>10}")
+    for size in (100, 1000, 5000, 10000, 50000):
+        taxonomy = set()
+        while len(taxonomy) < size:
+            taxonomy.add(random_skill())
+        taxonomy = sorted(taxonomy)
+        queries = [perturb(random.choice(taxonomy)) for _ in range(40)] + [random_skill() for _ in range(10)]
+
+        started = time.perf_counter()
+        index = SkillIndex(taxonomy)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        loop_ms = float('nan')
+        if fuzz is not None: # The pre-index pure-Python loop over every pair (a subset of queries at large sizes)
+            loop_queries = queries[:max(2, 20000 // size)]
+            started = time.perf_counter()
+            for query in loop_queries:
+                query_norm = taxonomy_key(query)
+                max(((fuzz.ratio(query_norm, norm), norm) for norm in index.norms), key=lambda pair: pair[0])
+            loop_ms = (time.perf_counter() - started) * 1000 / len(loop_queries)
+
+        started = time.perf_counter()
+        exact = [index.best_match(query, prune=False) for query in queries]
+        full_ms = (time.perf_counter() - started) * 1000 / len(queries)
+        started = time.perf_counter()
+        pruned = [index.best_match(query, prune=True) for query in queries]
+        pruned_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        average_candidates = sum(len(index.candidates(taxonomy_key(query))) for query in queries) / len(queries)
+        # Recall: of the queries with a real match (exact best score >= 80), how many the pruned search also finds
+        matched = [(p, e) for p, e in zip(pruned, exact) if e[1] >= 80]
+        recall = sum(p[1] == e[1] for p, e in matched) / max(1, len(matched))
+        print(f"{size:>7} {build_ms:>9.1f} {loop_ms:>10.2f} {full_ms:>10.2f} {pruned_ms:>12.2f} {average_candidates:>10.1f} {recall:>10.0%}")
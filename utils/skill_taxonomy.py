@@ -0,0 +1,142 @@
+# utils/skill_taxonomy.py
+import json
+import os
+import re
+from functools import lru_cache
+from utils.startup_profiler import timed
+
+# --- Taxonomy Source ---
+# JSON file: {"skills": {canonical_skill: {"parent": category or null, "aliases": [...]}}}
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "./data/skill_taxonomy.json")
+
+_TERMINAL = "" # Trie key marking "an alias ends here" (never a real character)
+
+
+def taxonomy_key(text):
+    """
+    Lookup key for aliases: lowercase, separators ('-', '_', '/') become spaces, whitespace collapsed.
+    Unlike normalize_text it keeps '+', '#' and '.', so C, C++, C# and .NET stay distinct
+    (a leading dot is kept, trailing and standalone dots are dropped).
+    """
+    text = re.sub(r'[-_/]+', ' ', str(text).lower())
+    text = re.sub(r'[^a-z0-9+#. ]+', '', text)
+    text = re.sub(r'(?:^|\s)\.+(?=\s|$)', ' ', text) # Dots that aren't part of a word
+    return re.sub(r'\s+', ' ', text).strip(' ').rstrip('.')
+
+
+class SkillTaxonomy:
+    """
+    Compiled, read-only skill taxonomy shared by every session.
+
+    - aliases: taxonomy_key(alias or canonical name) -> canonical skill, for O(1) exact hits
+    - lineage: canonical skill -> (skill, parent, grandparent, ...), precomputed
+    - trie: character trie over alias keys, for prefix completion and finding the longest
+      alias inside a multi-word phrase ("advanced python programming" -> Python)
+    """
+    def __init__(self, skills):
+        self.parents = {canonical: (entry or {}).get('parent') for canonical, entry in skills.items()}
+        self.aliases = {}
+        self.trie = {}
+        for canonical, entry in skills.items():
+            for alias in [canonical, *(entry or {}).get('aliases', [])]:
+                self._add_alias(alias, canonical)
+        self.lineages = {canonical: self._build_lineage(canonical) for canonical in self.parents}
+
+    def _add_alias(self, alias, canonical):
+        key = taxonomy_key(alias)
+        if not key:
+            return
+        if self.aliases.get(key, canonical) != canonical:
+            print(f"Warning: Taxonomy alias '{alias}' maps to both '{self.aliases[key]}' and '{canonical}'; keeping the first.")
+            return
+        self.aliases[key] = canonical
+        node = self.trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = canonical
+
+    def _build_lineage(self, canonical):
+        lineage = [canonical]
+        parent = self.parents.get(canonical)
+        while parent and parent not in lineage: # Guard against cycles in a hand-edited file
+            if parent not in self.parents:
+                print(f"Warning: Taxonomy parent '{parent}' of '{lineage[-1]}' is not defined as a skill.")
+            lineage.append(parent)
+            parent = self.parents.get(parent)
+        return tuple(lineage)
+
+    def __len__(self):
+        return len(self.parents)
+
+    def canonical(self, text):
+        """ Canonical skill for an exact alias (O(1)), or None. """
+        return self.aliases.get(taxonomy_key(text))
+
+    def longest_alias_in(self, text):
+        """ Canonical skill of the longest alias that appears in `text` as whole words, or None. """
+        key = taxonomy_key(text)
+        best, best_length = None, 0
+        for start in [0] + [match.end() for match in re.finditer(' ', key)]:
+            node = self.trie
+            for position in range(start, len(key)):
+                node = node.get(key[position])
+                if node is None:
+                    break
+                end = position + 1
+                if _TERMINAL in node and (end == len(key) or key[end] == ' ') and end - start > best_length:
+                    best, best_length = node[_TERMINAL], end - start
+        return best
+
+    def resolve(self, text):
+        """ (canonical skill, 'alias' | 'phrase') for a user skill, or (None, None). """
+        canonical = self.canonical(text)
+        if canonical:
+            return canonical, 'alias'
+        canonical = self.longest_alias_in(text)
+        return (canonical, 'phrase') if canonical else (None, None)
+
+    def lineage(self, text):
+        """ (canonical, parent, ...) for a user skill the taxonomy recognizes, else (). """
+        canonical, _ = self.resolve(text)
+        return self.lineages.get(canonical, ()) if canonical else ()
+
+    def complete(self, prefix, limit=10):
+        """ Canonical skills whose aliases start with `prefix` (shortest aliases first), for autocomplete. """
+        node = self.trie
+        for char in taxonomy_key(prefix):
+            node = node.get(char)
+            if node is None:
+                return []
+        found, frontier = [], [node]
+        while frontier and len(found) < limit: # Breadth-first, so shorter completions come first
+            next_frontier = []
+            for current in frontier:
+                for char, child in current.items():
+                    if char == _TERMINAL:
+                        if child not in found:
+                            found.append(child)
+                    else:
+                        next_frontier.append(child)
+            frontier = next_frontier
+        return found[:limit]
+
+
+@lru_cache(maxsize=None)
+def get_skill_taxonomy(path=SKILL_TAXONOMY_PATH):
+    """ Loads and compiles the taxonomy file once per process; an unreadable file gives an empty taxonomy. """
+    try:
+        with timed("load skill taxonomy"):
+            with open(path, 'r') as f:
+                return SkillTaxonomy(json.load(f).get('skills', {}))
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"ERROR: Skill taxonomy could not be loaded from '{path}': {e}")
+        return SkillTaxonomy({})
+
+
+# --- Test Block ---
+if __name__ == '__main__':
+    taxonomy = get_skill_taxonomy()
+    print(f"{len(taxonomy)} skills, {len(taxonomy.aliases)} aliases")
+    for text in ["git", "C++", "c#", "K8s", "ReactJS", "advanced python programming", "problem solving", "basket weaving"]:
+        print(f"{text!r:32} -> {taxonomy.resolve(text)}  lineage={taxonomy.lineage(text)}")
+    print("complete('py'):", taxonomy.complete('py'))
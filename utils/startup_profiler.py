@@ -0,0 +1,61 @@
+# utils/startup_profiler.py
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Startup Cost Tracking ---
+# Records how long heavy imports and lazy agent/LLM construction take, relative to process start
+# (first import of this module), so cold-start regressions show up in the logs.
+_PROCESS_T0 = time.perf_counter()
+_records = [] # (label, started_at_offset_s, duration_s)
+_records_lock = threading.Lock()
+_reported = False
+
+
+def _record(label, started, duration):
+    with _records_lock:
+        _records.append((label, started - _PROCESS_T0, duration))
+
+
+@contextmanager
+def timed(label):
+    """ Times the enclosed block and adds it to the startup report. """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(label, started, time.perf_counter() - started)
+
+
+def timed_import(module_name):
+    """ importlib.import_module() that records first-import cost (already-loaded modules are free and not recorded). """
+    import sys
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    with timed(f"import {module_name}"):
+        return importlib.import_module(module_name)
+
+
+def mark(label):
+    """ Records a zero-length milestone (e.g. 'first page painted'). """
+    _record(label, time.perf_counter(), 0.0)
+
+
+def startup_report():
+    """ Returns the recorded entries as dicts, in the order they happened. """
+    with _records_lock:
+        return [{'label': label, 'at_s': round(at, 4), 'duration_s': round(duration, 4)}
+                for label, at, duration in sorted(_records, key=lambda record: record[1])]
+
+
+def print_startup_report(once=True):
+    """ Prints the startup report; with once=True only the first call per process prints. """
+    global _reported
+    if once and _reported:
+        return
+    _reported = True
+    print("--- Startup Report (seconds since process start) ---")
+    for entry in startup_report():
+        duration = f"{entry['duration_s']:.3f}s" if entry['duration_s'] else "-"
+        print(f"  t={entry['at_s']:7.3f}  {duration:>8}  {entry['label']}")
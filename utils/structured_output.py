@@ -0,0 +1,166 @@
+# utils/structured_output.py
+import json
+import re
+from utils.agent_helpers import parse_json_output
+
+# --- Declared Output Schemas (JSON Schema subset) ---
+# Keys are model-chosen skill names, so these are open maps (additionalProperties) rather than fixed properties.
+PROFICIENCY_SCHEMA = {"type": "integer", "minimum": 0, "maximum": 100}
+
+BASELINE_SCHEMA = {
+    "type": "object",
+    "description": "Map of skill name to baseline proficiency (0-100).",
+    "additionalProperties": PROFICIENCY_SCHEMA,
+    "minProperties": 1,
+}
+
+ROLE_BASELINE_SCHEMA = {
+    "type": "object",
+    "description": "Skills of a role by category, each a map of skill name to baseline proficiency (0-100).",
+    "properties": {
+        "Core Technical Skills": BASELINE_SCHEMA,
+        "Secondary Technical Skills/Tools": {**BASELINE_SCHEMA, "minProperties": 0},
+        "Soft Skills": {**BASELINE_SCHEMA, "minProperties": 0},
+    },
+    "required": ["Core Technical Skills"],
+}
+
+RESOURCE_MAP_SCHEMA = {
+    "type": "object",
+    "description": "Map of skill name to a list of free learning resources ('Name - Type: URL').",
+    "additionalProperties": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+    "minProperties": 1,
+}
+
+
+class SchemaError(ValueError):
+    """ Raised when a value cannot be coerced into its declared schema. """
+
+
+def _coerce_number(value, schema, path):
+    if isinstance(value, bool):
+        raise SchemaError(f"{path}: expected a number, got a boolean")
+    if isinstance(value, str):
+        match = re.search(r'-?\d+(?:\.\d+)?', value) # "75", "75%", "~75/100"
+        if not match:
+            raise SchemaError(f"{path}: expected a number, got {value!r}")
+        value = float(match.group(0))
+    if not isinstance(value, (int, float)):
+        raise SchemaError(f"{path}: expected a number, got {type(value).__name__}")
+    if "minimum" in schema:
+        value = max(schema["minimum"], value)
+    if "maximum" in schema:
+        value = min(schema["maximum"], value)
+    return int(round(value)) if schema["type"] == "integer" else float(value)
+
+
+def _coerce_object(value, schema, path, warnings):
+    if not isinstance(value, dict):
+        raise SchemaError(f"{path}: expected an object, got {type(value).__name__}")
+    properties = schema.get("properties", {})
+    # Match declared property names loosely (case/punctuation), models rarely echo them exactly
+    declared = {re.sub(r'[^a-z0-9]+', '', name.lower()): name for name in properties}
+    result = {}
+    for key, item in value.items():
+        name = declared.get(re.sub(r'[^a-z0-9]+', '', str(key).lower()))
+        item_schema = properties[name] if name else schema.get("additionalProperties")
+        if item_schema is None:
+            warnings.append(f"{path}.{key}: unexpected property dropped")
+            continue
+        try:
+            result[name or str(key).strip()] = coerce_to_schema(item, item_schema, f"{path}.{key}", warnings)
+        except SchemaError as e:
+            if name in schema.get("required", ()):
+                raise
+            warnings.append(f"{e} (dropped)") # One bad entry shouldn't discard the rest of the map
+    missing = [name for name in schema.get("required", ()) if name not in result]
+    if missing:
+        raise SchemaError(f"{path}: missing required {missing}")
+    if len(result) < schema.get("minProperties", 0):
+        raise SchemaError(f"{path}: expected at least {schema['minProperties']} usable entries, got {len(result)}")
+    return result
+
+
+def _coerce_array(value, schema, path, warnings):
+    if isinstance(value, (str, dict)):
+        value = [value] # A single item where a list was declared
+    if not isinstance(value, list):
+        raise SchemaError(f"{path}: expected an array, got {type(value).__name__}")
+    result = []
+    for index, item in enumerate(value):
+        try:
+            result.append(coerce_to_schema(item, schema.get("items", {}), f"{path}[{index}]", warnings))
+        except SchemaError as e:
+            warnings.append(f"{e} (dropped)")
+    if len(result) < schema.get("minItems", 0):
+        raise SchemaError(f"{path}: expected at least {schema['minItems']} usable items, got {len(result)}")
+    return result
+
+
+def coerce_to_schema(value, schema, path="$", warnings=None):
+    """
+    Validates `value` against a JSON Schema subset (object/array/string/number/integer with min/max bounds),
+    coercing where the intent is clear: numeric strings become numbers, numbers are clamped to their bounds,
+    single items become one-element lists, dict entries become "key: value" strings.
+    Invalid map entries and list items are dropped (noted in `warnings`); anything else raises SchemaError.
+    """
+    warnings = warnings if warnings is not None else []
+    expected = schema.get("type")
+    if expected == "object":
+        return _coerce_object(value, schema, path, warnings)
+    if expected == "array":
+        return _coerce_array(value, schema, path, warnings)
+    if expected in ("integer", "number"):
+        return _coerce_number(value, schema, path)
+    if expected == "string":
+        if isinstance(value, dict):
+            return ": ".join(str(part) for part in value.values())
+        if value is None or isinstance(value, (list, bool)):
+            raise SchemaError(f"{path}: expected a string, got {type(value).__name__}")
+        text = str(value).strip()
+        if not text:
+            raise SchemaError(f"{path}: empty string")
+        return text
+    return value
+
+
+def parse_structured_output(llm_output, schema):
+    """
+    Parses agent output as JSON and coerces it to `schema`.
+
+    Returns:
+        tuple: (value or None, [problem descriptions]); value is None when nothing usable was produced.
+    """
+    parsed = parse_json_output(llm_output)
+    if parsed is None:
+        return None, ["The answer was not valid JSON."]
+    warnings = []
+    try:
+        return coerce_to_schema(parsed, schema, warnings=warnings), warnings
+    except SchemaError as e:
+        return None, warnings + [str(e)]
+
+
+def build_repair_prompt(description, previous_output, problems, schema):
+    """ Follow-up task asking the model to fix its previous answer so it matches the schema. """
+    previous_text = str(previous_output or "")[:4000]
+    return (
+        f"{description}\n\n"
+        "Your previous answer could not be used:\n"
+        + "\n".join(f"- {problem}" for problem in problems[:10]) +
+        f"\n\nPrevious answer:\n{previous_text}\n\n"
+        f"Return ONLY a corrected JSON value that matches this JSON Schema:\n{json.dumps(schema)}"
+    )
+
+
+# --- Test Block ---
+if __name__ == '__main__':
+    samples = [
+        'Sure! ```json\n{"Python": "80%", "SQL": 120, "Git": "expert", "Excel": 55.6}\n```',
+        '{"core technical skills": {"Python": 85}, "Soft Skills": {"Communication": "70"}}',
+        '{"React": "React Docs - Docs: https://react.dev", "CSS": []}',
+        'no json here',
+    ]
+    for sample, schema in zip(samples, [BASELINE_SCHEMA, ROLE_BASELINE_SCHEMA, RESOURCE_MAP_SCHEMA, BASELINE_SCHEMA]):
+        value, problems = parse_structured_output(sample, schema)
+        print(f"{sample[:40]!r:45} -> {value}  problems={problems}")